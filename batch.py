@@ -0,0 +1,190 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from itertools import islice
+from time import perf_counter
+from compact import CompactGraph, attach, attached, blockSize
+from hierarchy import ContractionHierarchy
+import instrument
+from math import inf
+import numpy as np
+import argparse
+import json
+import csv
+import sys
+import os
+
+#Modo por lotes sin interfaz gráfica: lee pares origen/destino (uno por línea, separados por
+#coma, tabulación o espacio) de un archivo o de la entrada estándar y escribe para cada uno la
+#distancia, la cantidad de tramos y el camino, en CSV o JSONL y en el mismo orden de entrada.
+#Los pares se agrupan por origen para calcular un solo árbol de caminos mínimos por origen, y
+#los grupos se reparten entre procesos que mapean en memoria la instantánea del grafo. Con
+#'--hierarchy' cada par se resuelve con la jerarquía de contracción guardada junto a la instantánea.
+#Con '--eccentricity K' no se leen pares: se escriben los K caminos mínimos más largos de la red
+#(ver 'eccentricity.py'), y el diámetro y el radio van a la salida de errores.
+
+FIELDS = ( 'source', 'destination', 'distance', 'hops', 'path' )
+
+_hierarchy: ContractionHierarchy | None = None #Jerarquía de contracción de cada proceso, si se usa.
+
+#Inicializador de los procesos: mapea la instantánea ('compact.attach') y, si se pide, carga la jerarquía.
+def _attach( directory, hierarchy = False ):
+  global _hierarchy
+  graph = attach( directory )
+  _hierarchy = ContractionHierarchy.load( os.path.join( directory, ContractionHierarchy.FILE ), graph ) if hierarchy else None
+
+#Resuelve un bloque de grupos [ ( origen, [ ( orden, destino ), ... ] ) ] de posiciones enteras y
+#devuelve [ ( orden, distancia, identificadores del camino ) ].
+def _run( groups ):
+  graph = attached()
+  codes = graph.columns[graph.identifier]
+  results = []
+  for source, queries in groups:
+    if _hierarchy is not None:
+      for order, destination in queries:
+        distance, path = _hierarchy.query( source, destination )
+        results.append( ( order, distance, codes[path].tolist() ) )
+      continue
+
+    #Con un único destino la búsqueda se detiene al alcanzarlo; si no, se calcula el árbol completo.
+    distances, predecessors = graph.shortestPathTree( source, queries[0][1] if len( queries ) == 1 else None )
+    for order, destination in queries:
+      if distances[destination] == inf:
+        results.append( ( order, inf, [] ) )
+        continue
+      path = [ destination ]
+      while path[-1] != source: path.append( predecessors[ path[-1] ] )
+      results.append( ( order, distances[destination], codes[ path[::-1] ].tolist() ) )
+  return results
+
+#Lee los pares de 'lines' de a 'size' por vez, ignorando líneas vacías y comentarios (#).
+def pairs( lines, size ):
+  rows = ( line.replace( ',', ' ' ).replace( '\t', ' ' ).split() for line in lines if line.strip() and not line.lstrip().startswith( '#' ) )
+  while True:
+    block = list( islice( rows, size ) )
+    if not block: return
+    yield block
+
+class Writer:
+  #Escribe los resultados en CSV o en JSONL (una línea JSON por par).
+  def __init__( self, output, format = 'csv' ):
+    self.output = output
+    self.format = format
+    if format == 'csv':
+      self.csv = csv.writer( output, lineterminator='\n' )
+      self.csv.writerow( FIELDS )
+
+  #Escribe un resultado; un par sin camino (o con aeropuertos inexistentes) no tiene distancia ni tramos.
+  def write( self, source, destination, distance, path, error = None ):
+    reachable = distance < inf
+    if self.format == 'csv':
+      self.csv.writerow( ( source, destination, distance if reachable else '', len( path ) - 1 if reachable else '', ' '.join( path ) ) )
+    else:
+      row = dict( zip( FIELDS, ( source, destination, distance if reachable else None, len( path ) - 1 if reachable else None, path ) ) )
+      if error: row['error'] = error
+      self.output.write( json.dumps( row ) + '\n' )
+
+#Resuelve los pares de 'lines' y escribe los resultados en 'output'. Devuelve la cantidad de pares.
+def route( lines, output, snapshot, format = 'csv', workers = None, size = 100_000, hierarchy = False ) -> int:
+  graph = CompactGraph.load( snapshot )
+  if hierarchy: ContractionHierarchy.open( snapshot, graph ) #Los procesos la cargan desde el archivo.
+  codes = graph.columns[graph.identifier]
+  workers = workers or os.cpu_count() or 1
+  writer = Writer( output, format )
+  total = 0
+
+  pool = ProcessPoolExecutor( workers, initializer=_attach, initargs=( snapshot, hierarchy ) ) if workers > 1 else None
+  if pool is None: _attach( snapshot, hierarchy )
+  try:
+    for block in pairs( lines, size ):
+      #Busca todas las posiciones del bloque con una sola búsqueda binaria vectorizada.
+      wanted = np.array( [ ( row + [ '', '' ] )[:2] for row in block ], dtype=str )
+      positions = np.searchsorted( codes, wanted ).clip( 0, len( codes ) - 1 )
+      known = codes[positions] == wanted
+
+      groups: dict[int, list[tuple[int, int]]] = {}
+      for order, ( source, destination ) in enumerate( positions.tolist() ):
+        if known[order].all(): groups.setdefault( source, [] ).append( ( order, destination ) )
+
+      groups = list( groups.items() )
+      step = blockSize( len( groups ), workers )
+      tasks = [ groups[i:i + step] for i in range( 0, len( groups ), step ) ]
+      results: list = [ None ] * len( block )
+      for chunk in ( pool.map( _run, tasks ) if pool else map( _run, tasks ) ):
+        for order, distance, path in chunk: results[order] = ( distance, path )
+
+      for order, ( source, destination ) in enumerate( wanted.tolist() ):
+        if results[order] is None: writer.write( source, destination, inf, [], 'unknown airport' )
+        else: writer.write( source, destination, *results[order] )
+      total += len( block )
+  finally:
+    if pool: pool.shutdown()
+  return total
+
+#Calcula (o reutiliza, si sigue vigente) la tabla de excentricidades guardada junto a la
+#instantánea y escribe sus 'k' caminos mínimos más largos, con el camino completo. Devuelve la tabla.
+def longest( output, snapshot, k = 10, format = 'csv', workers = None ):
+  from eccentricity import EccentricityTable, compute
+  table = compute( snapshot, k, workers, os.path.join( snapshot, EccentricityTable.FILE ) )
+
+  graph = attach( snapshot )
+  codes = graph.columns[graph.identifier]
+  positions = np.searchsorted( codes, [ ( source, destination ) for _, source, destination in table.longest ] ).reshape( -1, 2 )
+  writer = Writer( output, format )
+  for order, distance, path in _run( [ ( source, [ ( order, destination ) ] ) for order, ( source, destination ) in enumerate( positions.tolist() ) ] ):
+    writer.write( path[0], path[-1], distance, path )
+  return table
+
+def main( argv = None ) -> int:
+  parser = argparse.ArgumentParser( prog='main.py', description='Caminos mínimos por lotes entre pares de aeropuertos.' )
+  parser.add_argument( 'input', nargs='?', default='-', help='archivo con pares "origen,destino" (por defecto, la entrada estándar)' )
+  parser.add_argument( '-o', '--output', default='-', help='archivo de salida (por defecto, la salida estándar)' )
+  parser.add_argument( '-f', '--format', choices=( 'csv', 'jsonl' ), default='csv' )
+  parser.add_argument( '-w', '--workers', type=int, default=None, help='cantidad de procesos (por defecto, uno por núcleo)' )
+  parser.add_argument( '-b', '--batch', type=int, default=100_000, help='pares leídos y resueltos por vez' )
+  parser.add_argument( '--skip-header', action='store_true', help='ignora la primera línea de la entrada' )
+  parser.add_argument( '--profile', metavar='JSON', help='mide las operaciones (incluida la carga del grafo) y guarda las estadísticas en este archivo' )
+  parser.add_argument( '--hierarchy', action='store_true', help='usa la jerarquía de contracción (se construye y se guarda junto a la instantánea la primera vez)' )
+  parser.add_argument( '--eccentricity', type=int, metavar='K', help='en lugar de resolver pares, escribe los K caminos mínimos más largos de la red y muestra el diámetro y el radio (la tabla se guarda junto a la instantánea)' )
+  args = parser.parse_args( argv )
+
+  #La medición se activa antes de cargar el grafo (con '--profile' o con la variable AEROPUERTOS_PROFILE).
+  profiler = instrument.startup( args.profile is not None )
+
+  #Solo se valida la instantánea contra el CSV; el grafo se construye únicamente si falta o está
+  #desactualizada (los mensajes de la carga van a la salida de errores para no mezclarse con los resultados).
+  import dataset
+  if CompactGraph.load( dataset.SNAPSHOT, dataset.FLIGHTS ) is None:
+    with redirect_stdout( sys.stderr ):
+      dataset.parse( dataset.FLIGHTS ).save( dataset.SNAPSHOT, dataset.FLIGHTS )
+
+  output = sys.stdout if args.output == '-' else open( args.output, 'w', encoding='utf-8', newline='' )
+  start = perf_counter()
+  if args.eccentricity is not None:
+    try:
+      table = longest( output, dataset.SNAPSHOT, args.eccentricity, args.format, args.workers )
+    finally:
+      if output is not sys.stdout: output.close()
+    elapsed = perf_counter() - start
+    print( f"Diámetro: {table.diameter:.2f} km, radio: {table.radius:.2f} km ({elapsed:.2f} s).", file=sys.stderr )
+    operation = 'batch.eccentricity'
+  else:
+    source = sys.stdin if args.input == '-' else open( args.input, encoding='utf-8' )
+    try:
+      if args.skip_header: next( source, None )
+      total = route( source, output, dataset.SNAPSHOT, args.format, args.workers, args.batch, args.hierarchy )
+    finally:
+      if source is not sys.stdin: source.close()
+      if output is not sys.stdout: output.close()
+    elapsed = perf_counter() - start
+    print( f"{total} pares resueltos en {elapsed:.2f} s ({total / max( elapsed, 1e-9 ):.0f} pares/s).", file=sys.stderr )
+    operation = 'batch.route'
+
+  if profiler:
+    profiler.record( operation, start, elapsed )
+    if args.profile: profiler.toJSON( args.profile )
+    else: print( json.dumps( profiler.snapshot(), indent=2 ), file=sys.stderr )
+  return 0
+
+if __name__ == '__main__':
+  sys.exit( main() )
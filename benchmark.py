@@ -0,0 +1,167 @@
+from __future__ import annotations
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import numpy as np
+import argparse
+import platform
+import tracemalloc
+import json
+import sys
+import os
+import io
+
+#Banco de pruebas de rendimiento: genera redes sintéticas de aeropuertos con semilla fija
+#(coordenadas aleatorias y grado de los centros con ley de potencia) de distintos tamaños, mide
+#el tiempo y el pico de memoria de las operaciones principales y guarda los resultados en JSON
+#para compararlos con una ejecución anterior.
+#
+#  python benchmark.py --scales 1000 10000 --save base.json
+#  python benchmark.py --scales 1000 10000 --compare base.json
+
+SCALES = ( 1_000, 10_000, 100_000, 1_000_000 ) #Cantidad de filas (rutas) del CSV de cada red.
+COLUMNS = ( 'Code', 'Name', 'City', 'Country', 'Latitude', 'Longitude' )
+
+#Escribe en 'path' un CSV con el formato de 'data/flights.csv' y 'routes' filas. Los orígenes son
+#uniformes y los destinos siguen una ley de potencia (pocos centros con muchas rutas).
+def generate( path, routes, seed = 0, exponent = 1.2 ):
+  rng = np.random.default_rng( seed )
+  size = max( 50, routes // 6 )
+  codes = np.char.add( 'A', np.arange( size ).astype( str ) )
+  airports = {
+    'Code': codes,
+    'Name': np.char.add( 'Airport ', codes ),
+    'City': np.char.add( 'City ', ( np.arange( size ) % 997 ).astype( str ) ),
+    'Country': np.char.add( 'Country ', ( np.arange( size ) % 193 ).astype( str ) ),
+    'Latitude': rng.uniform( -60, 70, size ).round( 4 ),
+    'Longitude': rng.uniform( -180, 180, size ).round( 4 ),
+  }
+  hubs = 1 / np.arange( 1, size + 1 )**exponent
+  sources = rng.integers( 0, size, routes )
+  destinations = rng.permutation( size )[ rng.choice( size, routes, p=hubs / hubs.sum() ) ]
+
+  from pandas import DataFrame
+  data = DataFrame({ **{ f'Source Airport {c}': airports[c][sources] for c in COLUMNS }, **{ f'Destination Airport {c}': airports[c][destinations] for c in COLUMNS } })
+  data['Distance'] = 0
+  data[ sources != destinations ].to_csv( path, index=False )
+
+#Tiempo (el mejor de 'repeat' ejecuciones) y pico de memoria (una ejecución con 'tracemalloc',
+#que no se usa para medir el tiempo porque lo distorsiona) de 'function'. Con 'setup' se prepara
+#el estado antes de cada ejecución sin medirlo.
+def measure( function, repeat = 3, setup = None, count = 1 ) -> dict:
+  times = []
+  for _ in range( repeat ):
+    if setup: setup()
+    start = perf_counter()
+    function()
+    times.append( perf_counter() - start )
+
+  if setup: setup()
+  tracemalloc.start()
+  function()
+  peak = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+  return { 'seconds': min( times ), 'perCall': min( times ) / count, 'calls': count, 'peak': peak }
+
+#Mide las operaciones sobre la red del CSV 'path'. 'matrixLimit' evita la matriz de costos
+#(cuadrática en memoria) en redes con más vértices que ese límite.
+def run( path, seed = 0, samples = 1000, matrixLimit = 5000 ) -> dict:
+  rng = np.random.default_rng( seed )
+  results = {}
+
+  import dataset
+  with redirect_stdout( io.StringIO() ):
+    results['ingest'] = measure( lambda: dataset.parse( path, progress=None ), repeat=1 )
+    graph = dataset.parse( path, progress=None )
+
+  vertices = graph.vertices
+  codes = [ v.data[graph.identifier] for v in vertices ]
+  picks = rng.integers( 0, len( vertices ), ( samples, 2 ) ).tolist()
+  hub = max( vertices, key=lambda v: len( v.edges ) )
+  results['vertices'] = len( vertices )
+  results['edges'] = len( graph.edges )
+
+  results['getVertex'] = measure( lambda: [ graph.getVertex( codes[i] ) for i, _ in picks ], count=samples )
+  results['distance'] = measure( lambda: [ graph.distance( codes[i], codes[j] ) for i, j in picks ], count=samples )
+  results['dijkstra'] = measure( lambda: graph.dijkstra( hub ) )
+  tree = graph.dijkstra( hub )
+  results['getPath'] = measure( lambda: [ graph.getPath( tree, hub, vertices[j] ) for _, j in picks ], count=samples )
+
+  #El resumen de conectividad se descarta antes de cada ejecución para medir su construcción.
+  reset = lambda: setattr( graph, '_summary', None )
+  results['connectedComponents'] = measure( graph.connectedComponents, setup=reset )
+  results['findMinimumSpanningTrees'] = measure( graph.findMinimumSpanningTrees, setup=reset )
+  results['prim'] = measure( lambda: graph.prim( hub ), repeat=1 )
+
+  if len( vertices ) <= matrixLimit: results['costMatrix'] = measure( lambda: graph.costMatrix, repeat=1 )
+  else: results['costMatrix'] = None #Omitida por tamaño.
+  return results
+
+#Genera y mide cada escala en un directorio temporal.
+def benchmark( scales = SCALES, seed = 0, samples = 1000, matrixLimit = 5000, log = sys.stderr ) -> dict:
+  report = {
+    'meta': { 'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(), 'seed': seed, 'samples': samples },
+    'results': {},
+  }
+  with TemporaryDirectory() as directory:
+    for routes in scales:
+      path = os.path.join( directory, f'flights{routes}.csv' )
+      start = perf_counter()
+      generate( path, routes, seed )
+      print( f"Red de {routes} rutas generada en {perf_counter() - start:.2f} s.", file=log )
+      report['results'][ str( routes ) ] = run( path, seed, samples, matrixLimit )
+      print( table( { str( routes ): report['results'][ str( routes ) ] } ), file=log )
+      os.remove( path )
+  return report
+
+#Tabla legible de los resultados.
+def table( results: dict ) -> str:
+  lines = []
+  for scale, operations in results.items():
+    lines.append( f"{scale} rutas ({operations['vertices']} vértices, {operations['edges']} aristas)" )
+    for name, result in operations.items():
+      if name in ( 'vertices', 'edges' ): continue
+      if result is None: lines.append( f"  {name:<26} omitida" )
+      else: lines.append( f"  {name:<26} {result['perCall'] * 1000:>12.4f} ms/llamada {result['peak'] / 2**20:>10.2f} MiB" )
+  return '\n'.join( lines )
+
+NOISE = { 'perCall': 1e-6, 'peak': 64 * 2**10 } #Diferencias absolutas por debajo de estas se ignoran.
+
+#Operaciones cuyo tiempo por llamada o pico de memoria superan al de 'baseline' en más de 'tolerance'
+#(fracción). Devuelve una lista de ( escala, operación, medida, anterior, actual ).
+def compare( baseline: dict, current: dict, tolerance = 0.25 ) -> list[tuple]:
+  regressions = []
+  for scale, operations in current['results'].items():
+    for name, result in operations.items():
+      before = baseline['results'].get( scale, {} ).get( name )
+      if not isinstance( result, dict ) or not isinstance( before, dict ): continue
+      for metric in ( 'perCall', 'peak' ):
+        if result[metric] > before[metric] * ( 1 + tolerance ) and result[metric] - before[metric] > NOISE[metric]:
+          regressions.append( ( scale, name, metric, before[metric], result[metric] ) )
+  return regressions
+
+def main( argv = None ) -> int:
+  parser = argparse.ArgumentParser( description='Banco de pruebas de rendimiento del grafo de aeropuertos.' )
+  parser.add_argument( '--scales', type=int, nargs='+', default=list( SCALES ), help='cantidad de rutas de cada red' )
+  parser.add_argument( '--seed', type=int, default=0 )
+  parser.add_argument( '--samples', type=int, default=1000, help='consultas por operación puntual' )
+  parser.add_argument( '--matrix-limit', type=int, default=5000, help='máximo de vértices para medir la matriz de costos' )
+  parser.add_argument( '--save', help='guarda los resultados en este archivo JSON' )
+  parser.add_argument( '--compare', help='compara con los resultados de este archivo JSON' )
+  parser.add_argument( '--tolerance', type=float, default=0.25, help='aumento relativo permitido antes de considerarlo una regresión' )
+  args = parser.parse_args( argv )
+
+  report = benchmark( args.scales, args.seed, args.samples, args.matrix_limit )
+  if args.save:
+    with open( args.save, 'w', encoding='utf-8' ) as file: json.dump( report, file, indent=2 )
+
+  if args.compare:
+    with open( args.compare, encoding='utf-8' ) as file: baseline = json.load( file )
+    regressions = compare( baseline, report, args.tolerance )
+    for scale, name, metric, before, after in regressions:
+      print( f"Regresión en {name} ({scale} rutas): {metric} {before:.6g} -> {after:.6g}", file=sys.stderr )
+    if regressions: return 1
+  return 0
+
+if __name__ == '__main__':
+  sys.exit( main() )
@@ -0,0 +1,57 @@
+from __future__ import annotations
+from collections import OrderedDict
+import sys
+
+class ShortestPathCache:
+  #Caché LRU de árboles de caminos mínimos ({ vértice: ( distancia, predecesor ) }) por vértice
+  #de origen, limitada por cantidad de árboles y por un presupuesto de memoria aproximado.
+
+  ENTRY_SIZE = sys.getsizeof( ( 0.0, None ) ) #Tamaño estimado de cada tupla ( distancia, predecesor ).
+
+  def __init__( self, size: int = 16, memory: int = 256 * 2**20 ):
+    self.size = size #Cantidad máxima de árboles.
+    self.memory = memory #Presupuesto de memoria en bytes.
+    self._trees: OrderedDict = OrderedDict() #Origen -> ( árbol, bytes estimados ), del menos al más reciente.
+    self.used = 0 #Bytes estimados en uso.
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def __len__( self ): return len( self._trees )
+
+  def __contains__( self, source ): return source in self._trees
+
+  #Devuelve el árbol de 'source' (marcándolo como el más reciente) o None, contando aciertos y fallos.
+  def get( self, source ):
+    if source not in self._trees:
+      self.misses += 1
+      return None
+    self.hits += 1
+    self._trees.move_to_end( source )
+    return self._trees[source][0]
+
+  #Devuelve el árbol de 'source' sin alterar el orden ni los contadores.
+  def peek( self, source ):
+    entry = self._trees.get( source )
+    return entry[0] if entry else None
+
+  #Guarda un árbol y descarta los menos usados hasta respetar ambos límites.
+  def put( self, source, tree ):
+    if source in self._trees: self.used -= self._trees.pop( source )[1]
+    weight = sys.getsizeof( tree ) + len( tree ) * self.ENTRY_SIZE
+    if weight > self.memory or self.size < 1: return
+
+    self._trees[source] = ( tree, weight )
+    self.used += weight
+    while len( self._trees ) > self.size or self.used > self.memory:
+      self.used -= self._trees.popitem( last=False )[1][1]
+      self.evictions += 1
+
+  #Descarta todos los árboles (el grafo cambió).
+  def clear( self ):
+    self._trees.clear()
+    self.used = 0
+
+  #Estadísticas de uso de la caché.
+  def info( self ) -> dict:
+    return { 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'trees': len( self._trees ), 'size': self.size, 'bytes': self.used, 'memory': self.memory }
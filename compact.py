@@ -0,0 +1,343 @@
+from __future__ import annotations
+from math import inf, nan
+import numpy as np
+import hashlib
+import heapq
+import json
+import os
+from path import Path
+
+class CompactGraph:
+  #Motor de almacenamiento alternativo: vértices con identificadores enteros, adyacencia en
+  #arreglos CSR (offsets/targets/weights) y los atributos de los aeropuertos en columnas aparte.
+  #Los vértices y aristas son vistas livianas sobre esos arreglos.
+
+  #Inicializa el grafo a partir de las columnas (ordenadas por identificador) y los arreglos CSR.
+  def __init__( self, columns: dict[str, np.ndarray], offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray, identifier = 'Code' ):
+    self.columns = columns #Atributos de los vértices, una columna por campo.
+    self.offsets = offsets #Las aristas del vértice i ocupan targets[offsets[i]:offsets[i+1]].
+    self.targets = targets #Vértice destino de cada media arista.
+    self.weights = weights #Peso de cada media arista.
+    self.identifier = identifier
+
+    #Acceso rápido elemento a elemento desde Python (sin crear escalares de NumPy).
+    self._offsets = memoryview( offsets )
+    self._targets = memoryview( targets )
+    self._weights = memoryview( weights )
+
+  def __repr__( self ): return f"CompactGraph: ( Vertices: {len(self)}, Edges: {len(self.targets) // 2} )"
+
+  def __len__( self ): return len( self.offsets ) - 1
+
+  #Construye el grafo a partir de las columnas de los vértices y de las aristas no dirigidas
+  #dadas como arreglos de identificadores enteros (posiciones en las columnas).
+  @classmethod
+  def fromArrays( cls, columns: dict[str, np.ndarray], sources, destinations, weights, identifier = 'Code' ):
+    sources = np.asarray( sources, dtype=np.int64 )
+    destinations = np.asarray( destinations, dtype=np.int64 )
+    weights = np.asarray( weights, dtype=np.float64 )
+
+    #Ordena los vértices por identificador para poder buscarlos con búsqueda binaria.
+    order = np.argsort( columns[identifier], kind='stable' )
+    columns = { field: np.ascontiguousarray( column[order] ) for field, column in columns.items() }
+    rank = np.empty_like( order )
+    rank[order] = np.arange( len( order ) )
+    sources, destinations = rank[sources], rank[destinations]
+
+    #Los lazos no aportan a caminos, componentes ni árboles de expansión.
+    loops = sources == destinations
+    sources, destinations, weights = sources[~loops], destinations[~loops], weights[~loops]
+
+    #Cada arista no dirigida se guarda como dos medias aristas agrupadas por origen.
+    tails = np.concatenate( ( sources, destinations ) )
+    heads = np.concatenate( ( destinations, sources ) )
+    order = np.argsort( tails, kind='stable' )
+    offsets = np.zeros( len( rank ) + 1, dtype=np.int64 )
+    np.cumsum( np.bincount( tails, minlength=len( rank ) ), out=offsets[1:] )
+
+    return cls( columns, offsets, heads[order].astype( np.int32 ), np.concatenate( ( weights, weights ) )[order], identifier )
+
+  #Convierte un 'Graph' al formato compacto.
+  @classmethod
+  def fromGraph( cls, graph ):
+    vertices = graph._vertices
+    ids = { id( v ): i for i, v in enumerate( vertices ) }
+    fields = vertices[0].data.keys() if vertices else [ graph.identifier ]
+    columns = { field: asColumn( [ v.data[field] for v in vertices ] ) for field in fields }
+    sources = [ ids[ id( e.vertices[0] ) ] for e in graph._edges ]
+    destinations = [ ids[ id( e.vertices[1] ) ] for e in graph._edges ]
+    return cls.fromArrays( columns, sources, destinations, [ e.weight for e in graph._edges ], graph.identifier )
+
+  class Vertex:
+    __slots__ = ( 'graph', 'id' )
+
+    #Vista del vértice 'id' del grafo compacto.
+    def __init__( self, graph: CompactGraph, id: int ):
+      self.graph = graph
+      self.id = id
+
+    def __repr__( self ):
+      return str( self.graph.columns[self.graph.identifier][self.id] )
+
+    #Datos del vértice reconstruidos desde las columnas.
+    @property
+    def data( self ) -> dict:
+      return { field: asValue( column[self.id] ) for field, column in self.graph.columns.items() }
+
+    @property
+    def edges( self ) -> list[CompactGraph.Edge]:
+      return [ CompactGraph.Edge( self.graph, self.id, slot ) for slot in range( self.graph._offsets[self.id], self.graph._offsets[self.id + 1] ) ]
+
+    def __eq__( self, compare ):
+      return isinstance( compare, CompactGraph.Vertex ) and compare.graph is self.graph and compare.id == self.id
+
+    def __hash__( self ):
+      return self.id
+
+  class Edge:
+    __slots__ = ( 'graph', 'source', 'slot' )
+
+    #Vista de la media arista 'slot', que sale del vértice 'source'.
+    def __init__( self, graph: CompactGraph, source: int, slot: int ):
+      self.graph = graph
+      self.source = source
+      self.slot = slot
+
+    @property
+    def vertices( self ) -> tuple[CompactGraph.Vertex, CompactGraph.Vertex]:
+      return ( CompactGraph.Vertex( self.graph, self.source ), CompactGraph.Vertex( self.graph, self.graph._targets[self.slot] ) )
+
+    @property
+    def weight( self ) -> float:
+      return self.graph._weights[self.slot]
+
+    def __repr__( self ):
+      return f"( {self.weight}:{self.vertices[0]} <-> {self.vertices[1]} )"
+
+  @property
+  #Devuelve la lista de vistas de los vértices.
+  def vertices( self ) -> list[CompactGraph.Vertex]: return [ self.Vertex( self, i ) for i in range( len( self ) ) ]
+
+  @property
+  #Devuelve una lista de diccionarios que representan los datos de los vértices.
+  def data( self ) -> list[dict]: return [ v.data for v in self.vertices ]
+
+  @property
+  #Devuelve una vista por cada arista no dirigida (la media arista con origen menor).
+  def edges( self ) -> list[CompactGraph.Edge]:
+    sources = np.repeat( np.arange( len( self ) ), np.diff( self.offsets ) )
+    return [ self.Edge( self, int( sources[slot] ), int( slot ) ) for slot in np.flatnonzero( sources < self.targets ) ]
+
+  #Obtiene un vértice según su identificador con búsqueda binaria sobre la columna ordenada.
+  def getVertex( self, value ):
+    codes = self.columns[self.identifier]
+    i = int( np.searchsorted( codes, value ) )
+    if i < len( codes ) and codes[i] == value: return self.Vertex( self, i )
+    return None
+
+  #Árbol de caminos mínimos desde el vértice 'start' (entero) como listas de distancias y
+  #predecesores (-1 si no hay). Con 'destination' se detiene cuando ese vértice es definitivo.
+  def shortestPathTree( self, start: int, destination: int | None = None ):
+    offsets, targets, weights = self._offsets, self._targets, self._weights
+    distances = [ inf ] * len( self )
+    predecessors = [ -1 ] * len( self )
+    distances[start] = 0
+    toVisit = [ ( 0, start ) ]
+
+    while toVisit:
+      distance, min = heapq.heappop( toVisit )
+      if distance > distances[min]: continue #Entrada obsoleta.
+      if min == destination: break
+
+      for slot in range( offsets[min], offsets[min + 1] ):
+        neighbor = targets[slot]
+        if distance + weights[slot] < distances[neighbor]:
+          distances[neighbor] = distance + weights[slot]
+          predecessors[neighbor] = min
+          heapq.heappush( toVisit, ( distance + weights[slot], neighbor ) )
+
+    return distances, predecessors
+
+  #Algoritmo de Dijkstra con el mismo contrato que 'Graph.dijkstra': { vértice: ( distancia, predecesor ) }.
+  def dijkstra( self, start, destination = None ):
+    distances, predecessors = self.shortestPathTree( start.id, destination.id if destination is not None else None )
+    return {
+      self.Vertex( self, i ): ( distances[i], self.Vertex( self, predecessors[i] ) if predecessors[i] >= 0 else None )
+      for i in range( len( self ) )
+      if destination is None or distances[i] < inf
+    }
+
+  #Determina el camino mínimo entre dos vértices (mismo contrato que 'Graph.getPath').
+  def getPath( self, minpaths, source, destination ) -> Path:
+    return Path.fromTree( minpaths, source, destination )
+
+  #Etiqueta cada vértice con el número de su componente conexa (recorrido en anchura sobre los arreglos).
+  def componentLabels( self ) -> list[int]:
+    offsets, targets = self._offsets, self._targets
+    labels = [ -1 ] * len( self )
+    count = 0
+    for start in range( len( self ) ):
+      if labels[start] >= 0: continue
+      labels[start] = count
+      stack = [ start ]
+      while stack:
+        v = stack.pop()
+        for slot in range( offsets[v], offsets[v + 1] ):
+          if labels[ targets[slot] ] < 0:
+            labels[ targets[slot] ] = count
+            stack.append( targets[slot] )
+      count += 1
+    return labels
+
+  #Componentes conexas como lista de ( vértices, tamaño ), igual que 'Graph.connectedComponents'.
+  def connectedComponents( self ):
+    components: dict[int, list[CompactGraph.Vertex]] = {}
+    for i, label in enumerate( self.componentLabels() ):
+      components.setdefault( label, [] ).append( self.Vertex( self, i ) )
+    return [ ( component, len( component ) ) for component in components.values() ]
+
+  # Determina si el grafo es conexo.
+  def isConnected( self ) -> bool:
+    return len( self ) > 0 and max( self.componentLabels() ) == 0
+
+  #Peso del árbol de expansión mínima de la componente de 'start_vertex' (algoritmo de Prim).
+  def prim( self, start_vertex ):
+    offsets, targets, weights = self._offsets, self._targets, self._weights
+    visited = { start_vertex.id }
+    total_weight = 0
+    min_heap = [ ( weights[slot], targets[slot] ) for slot in range( offsets[start_vertex.id], offsets[start_vertex.id + 1] ) ]
+    heapq.heapify( min_heap )
+
+    while min_heap:
+      weight, v = heapq.heappop( min_heap )
+      if v in visited: continue
+      visited.add( v )
+      total_weight += weight
+      for slot in range( offsets[v], offsets[v + 1] ):
+        if targets[slot] not in visited:
+          heapq.heappush( min_heap, ( weights[slot], targets[slot] ) )
+
+    return total_weight
+
+  # Encuentra los árboles de expansión mínima de cada componente conexa.
+  def findMinimumSpanningTrees( self ):
+    return { tuple( component ): self.prim( component[0] ) for component, _ in self.connectedComponents() }
+
+  #Hash SHA-256 de los identificadores y de los arreglos CSR: cambia si cambia cualquier ruta. Las
+  #aristas de cada vértice se ordenan por destino y peso, así que no depende del orden en que se
+  #agregaron las rutas (un grafo reconstruido desde la instantánea tiene la misma firma).
+  def signature( self ) -> str:
+    sources = np.repeat( np.arange( len( self ) ), np.diff( self.offsets ) )
+    order = np.lexsort( ( self.weights, self.targets, sources ) )
+    sha = hashlib.sha256()
+    sha.update( np.ascontiguousarray( self.columns[self.identifier] ).astype( str ).tobytes() )
+    for array in ( self.offsets, np.asarray( self.targets )[order], np.asarray( self.weights )[order] ): sha.update( np.ascontiguousarray( array ).tobytes() )
+    return sha.hexdigest()
+
+  #Guarda el grafo como una instantánea binaria versionada en 'directory': un archivo .npy por
+  #arreglo (se pueden mapear en memoria al cargar) y 'meta.json' con la versión, los campos y,
+  #si se indica, la huella del archivo CSV de origen.
+  def save( self, directory, source = None ):
+    os.makedirs( directory, exist_ok=True )
+    meta = os.path.join( directory, 'meta.json' )
+    if os.path.exists( meta ): os.remove( meta ) #Sin 'meta.json' la instantánea se considera incompleta.
+
+    np.save( os.path.join( directory, 'offsets.npy' ), self.offsets )
+    np.save( os.path.join( directory, 'targets.npy' ), self.targets )
+    np.save( os.path.join( directory, 'weights.npy' ), self.weights )
+    missing = []
+    for i, ( field, column ) in enumerate( self.columns.items() ):
+      if column.dtype == object:
+        #Columna de texto con valores faltantes: se guarda como texto más una máscara de faltantes.
+        mask = np.array( [ isMissing( x ) for x in column ], dtype=bool )
+        np.save( os.path.join( directory, f'missing{i}.npy' ), mask )
+        column = np.array( [ '' if m else x for x, m in zip( column.tolist(), mask.tolist() ) ], dtype=str )
+        missing.append( field )
+      np.save( os.path.join( directory, f'column{i}.npy' ), column )
+
+    with open( meta, 'w', encoding='utf-8' ) as file:
+      json.dump( {
+        'version': SNAPSHOT_VERSION,
+        'identifier': self.identifier,
+        'fields': list( self.columns ),
+        'missing': missing,
+        'source': fingerprint( source ) if source else None,
+      }, file )
+
+  #Carga una instantánea guardada con 'save'. Devuelve None si no existe, si es de otra versión
+  #o si el CSV de origen cambió (tamaño, fecha de modificación o hash).
+  @classmethod
+  def load( cls, directory, source = None, mmap = True ):
+    try:
+      with open( os.path.join( directory, 'meta.json' ), encoding='utf-8' ) as file:
+        meta = json.load( file )
+    except ( OSError, ValueError ):
+      return None
+
+    if meta.get( 'version' ) != SNAPSHOT_VERSION: return None
+    if source and not matches( meta.get( 'source' ), source ): return None
+
+    mode = 'r' if mmap else None
+    array = lambda name: np.load( os.path.join( directory, name ), mmap_mode=mode )
+    columns = { field: array( f'column{i}.npy' ) for i, field in enumerate( meta['fields'] ) }
+    for i, field in enumerate( meta['fields'] ):
+      if field in meta['missing']: #Vuelve a poner NaN donde faltaba el valor (como al leer el CSV).
+        columns[field] = np.where( np.load( os.path.join( directory, f'missing{i}.npy' ) ), nan, columns[field].astype( object ) )
+    return cls( columns, array( 'offsets.npy' ), array( 'targets.npy' ), array( 'weights.npy' ), meta['identifier'] )
+
+
+SNAPSHOT_VERSION = 2 #Cambia cuando cambia el formato de la instantánea.
+
+#Un valor faltante: None o NaN (como los deja pandas en las celdas vacías del CSV).
+def isMissing( value ) -> bool:
+  return value is None or ( isinstance( value, float ) and value != value )
+
+#Columna de NumPy con los valores de un campo. Si hay valores faltantes entre valores que no son
+#números, la columna es de objetos para no convertirlos en el texto 'nan'.
+def asColumn( values ) -> np.ndarray:
+  array = np.array( values )
+  if array.dtype.kind in 'biuf' or not any( isMissing( x ) for x in values ): return array
+  return np.array( values, dtype=object )
+
+#Valor de Python de un elemento de una columna.
+def asValue( element ):
+  return element.item() if isinstance( element, np.generic ) else element
+
+#Huella de un archivo: tamaño, fecha de modificación y hash SHA-256 del contenido.
+def fingerprint( path, digest = True ):
+  stat = os.stat( path )
+  result = { 'size': stat.st_size, 'mtime': stat.st_mtime_ns }
+  if digest:
+    sha = hashlib.sha256()
+    with open( path, 'rb' ) as file:
+      for block in iter( lambda: file.read( 1 << 20 ), b'' ): sha.update( block )
+    result['sha256'] = sha.hexdigest()
+  return result
+
+#Comprueba si el archivo sigue teniendo la huella guardada. El hash solo se calcula cuando
+#el tamaño y la fecha de modificación coinciden.
+def matches( saved, path ):
+  try:
+    current = fingerprint( path, digest=False )
+  except OSError:
+    return False
+  if not saved or saved['size'] != current['size'] or saved['mtime'] != current['mtime']: return False
+  return saved['sha256'] == fingerprint( path )['sha256']
+
+_attached: CompactGraph | None = None #Grafo mapeado en memoria dentro de cada proceso de trabajo.
+
+#Inicializador de los procesos de trabajo ('ProcessPoolExecutor'): cada proceso mapea en memoria
+#la misma instantánea en lugar de recibir una copia del grafo.
+def attach( directory ) -> CompactGraph:
+  global _attached
+  _attached = CompactGraph.load( directory )
+  return _attached
+
+#Grafo que 'attach' mapeó en este proceso.
+def attached() -> CompactGraph | None:
+  return _attached
+
+#Tamaño de bloque para repartir 'total' tareas entre 'workers' procesos: bloques pequeños (unos
+#8 por proceso) para que la carga quede pareja aunque algunas tareas tarden más que otras.
+def blockSize( total, workers ) -> int:
+  return max( 1, -( -total // ( workers * 8 ) ) )
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+class UnionFind:
+  #Conjuntos disjuntos sobre los enteros 0..size-1 (compresión por mitades y unión por tamaño).
+  def __init__( self, size: int ):
+    self.parent = list( range( size ) )
+    self.size = [ 1 ] * size
+
+  #Devuelve el representante del conjunto de 'x'.
+  def find( self, x: int ) -> int:
+    parent = self.parent
+    while parent[x] != x:
+      parent[x] = parent[ parent[x] ]
+      x = parent[x]
+    return x
+
+  #Une los conjuntos de 'x' e 'y'; devuelve False si ya estaban unidos.
+  def union( self, x: int, y: int ) -> bool:
+    x, y = self.find( x ), self.find( y )
+    if x == y: return False
+    if self.size[x] < self.size[y]: x, y = y, x
+    self.parent[y] = x
+    self.size[x] += self.size[y]
+    return True
+
+
+class SpanningForest:
+  #Resumen de conectividad del grafo: componentes conexas y el peso del árbol de expansión
+  #mínima de cada una. Se construye con Kruskal y conjuntos disjuntos en una sola pasada sobre
+  #las aristas ordenadas por peso, y después se mantiene de forma incremental: el bosque de
+  #expansión mínima se guarda explícitamente para poder agregar y quitar aristas y vértices.
+  def __init__( self, vertices: list, edges ):
+    position = { id( v ): i for i, v in enumerate( vertices ) }
+    sets = UnionFind( len( vertices ) )
+    self.tree: dict = { v: {} for v in vertices } #Bosque de expansión mínima: vértice -> { vecino: peso }.
+    links = [] #Aristas elegidas por Kruskal.
+
+    for edge in sorted( edges, key=lambda e: e.weight ):
+      source, destination = edge.vertices
+      if sets.union( position[ id( source ) ], position[ id( destination ) ] ):
+        self._link( source, destination, edge.weight )
+        links.append( ( source, edge.weight ) )
+
+    self.label: dict = {} #Componente de cada vértice.
+    self.members: dict[int, dict] = {} #Vértices de cada componente (en orden de llegada).
+    for i, v in enumerate( vertices ):
+      self.label[v] = sets.find( i )
+      self.members.setdefault( self.label[v], {} )[v] = None
+
+    self.weight: dict[int, float] = { label: 0 for label in self.members } #Peso del árbol de cada componente.
+    for source, weight in links:
+      self.weight[ self.label[source] ] += weight
+    self._next = len( vertices ) #Próxima etiqueta de componente libre.
+
+  @property
+  #Vértices de cada componente.
+  def components( self ) -> list[list]: return [ list( members ) for members in self.members.values() ]
+
+  @property
+  #Peso del árbol de expansión mínima de cada componente (mismo orden que 'components').
+  def weights( self ) -> list[float]: return [ self.weight[label] for label in self.members ]
+
+  @property
+  #El grafo es conexo si tiene vértices y una única componente.
+  def isConnected( self ) -> bool: return len( self.members ) == 1
+
+  def _link( self, u, v, weight ):
+    self.tree[u][v] = weight
+    self.tree[v][u] = weight
+
+  def _cut( self, u, v ):
+    del self.tree[u][v]
+    del self.tree[v][u]
+
+  #Crea una componente nueva con los vértices dados.
+  def _newComponent( self, vertices, weight ) -> int:
+    label = self._next
+    self._next += 1
+    self.members[label] = {}
+    for v in vertices:
+      self.label[v] = label
+      self.members[label][v] = None
+    self.weight[label] = weight
+    return label
+
+  #Camino entre dos vértices de la misma componente dentro del bosque.
+  def _treePath( self, u, v ) -> list:
+    parent = { u: None }
+    stack = [ u ]
+    while v not in parent:
+      x = stack.pop()
+      for y in self.tree[x]:
+        if y not in parent:
+          parent[y] = x
+          stack.append( y )
+    path = [ v ]
+    while path[-1] is not u: path.append( parent[ path[-1] ] )
+    return path
+
+  #Tras cortar el árbol entre 'u' y 'v', recorre ambos lados a la vez y devuelve el que termina
+  #primero (el más pequeño) junto con el peso de sus aristas de árbol.
+  def _smallerSide( self, u, v ):
+    sides, queues, weights = [ { u: None }, { v: None } ], [ [ u ], [ v ] ], [ 0, 0 ]
+    while True:
+      for i in ( 0, 1 ):
+        if not queues[i]: return sides[i], weights[i]
+        x = queues[i].pop()
+        for y, weight in self.tree[x].items():
+          if y not in sides[i]:
+            sides[i][y] = None
+            queues[i].append( y )
+            weights[i] += weight
+
+  #Registra un vértice nuevo (aislado).
+  def addVertex( self, v ):
+    self.tree[v] = {}
+    self._newComponent( [ v ], 0 )
+
+  #Registra una arista nueva: une componentes distintas o, si cierra un ciclo, reemplaza la
+  #arista más pesada del ciclo en el árbol cuando la nueva es más liviana.
+  def addEdge( self, u, v, weight ):
+    if u is v: return
+    a, b = self.label[u], self.label[v]
+
+    if a != b:
+      if len( self.members[a] ) < len( self.members[b] ): a, b = b, a #Reetiqueta la componente menor.
+      for x in self.members[b]: self.label[x] = a
+      self.members[a].update( self.members.pop( b ) )
+      self.weight[a] += self.weight.pop( b ) + weight
+      self._link( u, v, weight )
+      return
+
+    path = self._treePath( u, v )
+    x, y = max( zip( path, path[1:] ), key=lambda pair: self.tree[ pair[0] ][ pair[1] ] )
+    if self.tree[x][y] > weight:
+      self.weight[a] += weight - self.tree[x][y]
+      self._cut( x, y )
+      self._link( u, v, weight )
+
+  #Registra que se quitó una arista del grafo (que ya no debe figurar en 'u.edges'). Si era del
+  #árbol, busca la arista de reemplazo más liviana desde el lado más pequeño del corte; si no
+  #existe, la componente se divide.
+  def removeEdge( self, u, v, weight ):
+    if self.tree[u].get( v ) != weight: return #No era una arista del árbol.
+
+    label = self.label[u]
+    self._cut( u, v )
+    self.weight[label] -= weight
+    side, sideWeight = self._smallerSide( u, v )
+
+    best = None
+    for x in side:
+      for edge in x.edges:
+        if edge.vertices[1] not in side and ( best is None or edge.weight < best[2] ):
+          best = ( x, edge.vertices[1], edge.weight )
+
+    if best:
+      self._link( *best )
+      self.weight[label] += best[2]
+    else:
+      for x in side: del self.members[label][x]
+      self._newComponent( side, sideWeight )
+      self.weight[label] -= sideWeight
+
+  #Registra que se quitó un vértice (después de quitar todas sus aristas).
+  def removeVertex( self, v ):
+    label = self.label.pop( v )
+    del self.members[label][v]
+    if not self.members[label]:
+      del self.members[label]
+      del self.weight[label]
+    del self.tree[v]
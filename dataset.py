@@ -1,52 +1,120 @@
-from pandas import read_csv
-from graph import Graph
-
-
-data = read_csv('data/flights.csv')
-
-#Crea dos listas vacías para almacenar datos de aeropuertos y rutas.
-airports = []
-routes = []
-
-for i, row in data.iterrows():
-
-  source = {} #Diccionario para los datos de origen del aeropuerto.
-  destination = {} #Diccionario para los datos de destino del aeropuerto.
-
-  for item in dict(row):
-
-    if 'Source' in item: source[ item.replace('Source Airport ', '') ] = row[item]
-    elif 'Destination' in item: destination[ item.replace('Destination Airport ', '') ] = row[item]
-
-  if not source in airports: airports.append( source ) #Si 'source' no está en 'airports', agrégalo a la lista de aeropuertos.
-  if not destination in airports: airports.append( destination ) #Si 'destination' no está en 'airports', agrégalo a la lista de aeropuertos.
-
-  #Crea una tupla 'route' que representa una ruta entre aeropuertos.
-
-  route = (source['Code'],destination['Code'])
-  if not ( route in routes or route[::-1] in routes ): routes.append(route)
-
-
-#Ordena la lista de aeropuertos según el código del aeropuerto.
-airports = sorted(airports, key=lambda x: x['Code'])
-
-#Representar el grafo de rutas entre aeropuertos.
-globe = Graph()
-
-numberVertex = 0
-
-#Agrega cada aeropuerto como un vértice al grafo.
-for airport in airports:
-  globe.newVertex( airport )
-  numberVertex += 1
-
-print(f"Se han agregado {numberVertex} vértices al grafo.")
-print(f"Se han agregado {len(routes)} aristas al grafo.")
-print(f"Aeropuertos: {len(airports)}")
-
-#Itera sobre las rutas y agrega cada ruta como una arista con su distancia calculada.
-for route in routes:
-  source = globe.getVertex(route[0])
-  destination = globe.getVertex(route[1])
-  globe.newEdge( route[0], route[1], globe.distance(route[0], route[1]) )
-  
\ No newline at end of file
+from __future__ import annotations
+from time import perf_counter
+import os
+from graph import Graph, haversine
+
+
+FLIGHTS = 'data/flights.csv'
+SNAPSHOT = 'data/flights.graph' #Instantánea binaria del grafo, regenerada cuando cambia el CSV.
+
+#Extrae las columnas de un extremo de la ruta ('Source' o 'Destination') sin el prefijo.
+def endpoint( data, side ):
+  columns = [ c for c in data.columns if side in c ]
+  return data[columns].rename( columns = lambda c: c.replace( f'{side} Airport ', '' ) )
+
+#Columnas de los extremos de cada ruta (la columna 'Distance' del CSV no se usa).
+def routeColumn( column ):
+  return column.startswith( ( 'Source Airport ', 'Destination Airport ' ) )
+
+#Lee el CSV por bloques de unas 'chunksize' filas y devuelve ( bloque, fracción del archivo leída ).
+#Con engine='pyarrow' (si está instalado) usa su lector por lotes, ya que 'read_csv' no admite
+#'chunksize' con ese motor; en ese caso la fracción no se conoce (None).
+def chunks( path, chunksize = 100_000, engine = None ):
+  from pandas import read_csv
+
+  if engine == 'pyarrow':
+    try:
+      from pyarrow import csv
+    except ImportError:
+      engine = None
+    else:
+      columns = [ c for c in read_csv( path, nrows=0 ).columns if routeColumn( c ) ]
+      reader = csv.open_csv( path, read_options=csv.ReadOptions( block_size=chunksize * 256 ), convert_options=csv.ConvertOptions( include_columns=columns ) )
+      for batch in reader: yield batch.to_pandas(), None
+      return
+
+  codes = { 'Source Airport Code': str, 'Destination Airport Code': str }
+  size = max( os.path.getsize( path ), 1 )
+  with open( path, 'rb' ) as file:
+    for data in read_csv( file, usecols=routeColumn, dtype=codes, chunksize=chunksize ):
+      yield data, min( file.tell() / size, 1.0 ) #Aproximada: el lector lee por adelantado.
+
+#Muestra cuántas filas se leyeron y a qué velocidad.
+def report( rows, rate, fraction = None ):
+  print( f"{rows} filas leídas ({rate:.0f} filas/s" + ( f", {fraction:.0%} del archivo)." if fraction is not None else ")." ) )
+
+#Lee el CSV de vuelos por bloques y construye el grafo de rutas entre aeropuertos. Cada bloque
+#agrega los aeropuertos y rutas nuevos y se descarta, así que la memoria depende del tamaño del
+#grafo y no del archivo. 'progress( filas, filas por segundo, fracción leída )' se llama después
+#de cada bloque. Los datos derivados del grafo se descartan una sola vez, al final.
+def parse( path, chunksize = 100_000, engine = None, progress = report ):
+  from pandas import concat, DataFrame
+  import numpy as np
+
+  #Representar el grafo de rutas entre aeropuertos.
+  graph = Graph()
+  routes = set() #Claves (menor, mayor) de las rutas ya agregadas.
+  known = DataFrame( { 'Latitude': [], 'Longitude': [] }, index=[] ) #Coordenadas en radianes de los aeropuertos agregados, por código.
+  rows = 0
+  start = perf_counter()
+
+  for data, fraction in chunks( path, chunksize, engine ):
+    sources = endpoint( data, 'Source' )
+    destinations = endpoint( data, 'Destination' )
+
+    #Une ambos extremos, elimina los aeropuertos repetidos por código y agrega solo los nuevos
+    #(se conservan los datos de la primera aparición de cada aeropuerto).
+    airports = concat( [ sources, destinations ], ignore_index=True ).drop_duplicates( subset='Code' )
+    airports = airports[ ~airports['Code'].isin( known.index ) ].sort_values( 'Code', kind='stable' )
+    graph.newVertices( airports.to_dict( 'records' ), invalidate=False )
+    known = concat( [ known, np.radians( airports.set_index( 'Code' )[[ 'Latitude', 'Longitude' ]].astype( float ) ) ] )
+
+    #Rutas no dirigidas: la clave (menor, mayor) identifica a 'route' y a 'route[::-1]'.
+    codes = DataFrame({ 'Source': sources['Code'].to_numpy(), 'Destination': destinations['Code'].to_numpy() })
+    swap = codes['Source'] > codes['Destination']
+    codes['Low'] = codes['Source'].where( ~swap, codes['Destination'] )
+    codes['High'] = codes['Destination'].where( ~swap, codes['Source'] )
+    codes = codes.drop_duplicates( subset=['Low', 'High'] )
+    keys = list( zip( codes['Low'].tolist(), codes['High'].tolist() ) )
+    fresh = [ key not in routes for key in keys ]
+    routes.update( keys )
+    codes = codes[fresh]
+
+    #Agrega las rutas nuevas como aristas, con las distancias del bloque calculadas en un solo paso.
+    if len( codes ):
+      lt0, ln0 = known.loc[ codes['Source'] ].to_numpy().T
+      ltf, lnf = known.loc[ codes['Destination'] ].to_numpy().T
+      graph.newEdges( codes['Source'].to_numpy(), codes['Destination'].to_numpy(), haversine( lt0, ln0, ltf, lnf ).tolist(), invalidate=False )
+
+    rows += len( data )
+    if progress: progress( rows, rows / max( perf_counter() - start, 1e-9 ), fraction )
+    del data, sources, destinations, airports, codes #El bloque ya se consumió.
+
+  graph.invalidate()
+  print(f"Se han agregado {len(known)} vértices al grafo.")
+  print(f"Se han agregado {len(routes)} aristas al grafo.")
+  print(f"Aeropuertos: {len(known)}")
+
+  return graph
+
+#Carga el grafo de vuelos: usa la instantánea si sigue vigente; si no, procesa el CSV (informando
+#el avance a 'progress', como en 'parse') y la regenera. Con 'hierarchy' también carga (o construye
+#y guarda junto a la instantánea) la jerarquía de contracción que usa 'Graph.route'; es opcional
+#porque construirla tarda bastante en grafos grandes, y sin ella 'route' usa A*.
+def load( progress = report, hierarchy = False ) -> Graph:
+  graph = Graph.load( SNAPSHOT, FLIGHTS )
+  if graph is None:
+    graph = parse( FLIGHTS, progress=progress )
+    graph.save( SNAPSHOT, FLIGHTS )
+  if hierarchy: graph.contract( SNAPSHOT )
+  return graph
+
+_globe: Graph | None = None
+
+#'dataset.globe' se construye con 'load' la primera vez que se usa (y no al importar el módulo).
+def __getattr__( name ):
+  global _globe
+  if name == 'globe':
+    if _globe is None: _globe = load()
+    return _globe
+  raise AttributeError( f"module {__name__!r} has no attribute {name!r}" )
@@ -0,0 +1,126 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import TemporaryDirectory
+from compact import CompactGraph, attach, attached, blockSize, fingerprint, matches
+import numpy as np
+import heapq
+import os
+
+#Métricas globales de caminos mínimos: excentricidad de cada aeropuerto (la mayor distancia
+#mínima a otro aeropuerto de su misma componente), diámetro, radio y los k caminos mínimos más
+#largos de toda la red. Los recorridos desde cada origen se reparten entre procesos que mapean
+#en memoria la misma instantánea del grafo ('CompactGraph.save').
+
+class EccentricityTable:
+  #Resultado del cálculo, guardable en disco para reutilizarlo.
+  FILE = 'eccentricity.npz' #Nombre del archivo junto a la instantánea del grafo.
+
+  def __init__( self, codes: np.ndarray, eccentricity: np.ndarray, farthest: np.ndarray, longest: list[tuple[float, str, str]] ):
+    self.codes = codes #Identificador de cada vértice.
+    self.eccentricity = eccentricity #Excentricidad de cada vértice dentro de su componente.
+    self.farthest = farthest #Posición del vértice más lejano de cada vértice (-1 si está aislado).
+    self.longest = longest #( distancia, origen, destino ) de los caminos mínimos más largos, de mayor a menor.
+
+  @property
+  #Mayor excentricidad de la red.
+  def diameter( self ) -> float: return float( self.eccentricity.max() ) if len( self.eccentricity ) else 0.0
+
+  @property
+  #Menor excentricidad entre los vértices que tienen al menos una ruta.
+  def radius( self ) -> float:
+    connected = self.eccentricity[ self.farthest >= 0 ]
+    return float( connected.min() ) if len( connected ) else 0.0
+
+  #Excentricidad y aeropuerto más lejano de un identificador.
+  def get( self, code ) -> tuple[float, str | None]:
+    i = int( np.searchsorted( self.codes, code ) )
+    if i >= len( self.codes ) or self.codes[i] != code: raise KeyError( code )
+    return float( self.eccentricity[i] ), ( str( self.codes[ self.farthest[i] ] ) if self.farthest[i] >= 0 else None )
+
+  #Guarda la tabla en 'path' (.npz); 'snapshot' identifica el grafo con el que se calculó.
+  def save( self, path, snapshot = None ):
+    longest = np.array( [ ( d, s, t ) for d, s, t in self.longest ], dtype=[ ( 'distance', 'f8' ), ( 'source', self.codes.dtype ), ( 'destination', self.codes.dtype ) ] )
+    source = fingerprint( os.path.join( snapshot, 'weights.npy' ) ) if snapshot else {}
+    with open( path, 'wb' ) as file:
+      np.savez( file, codes=self.codes, eccentricity=self.eccentricity, farthest=self.farthest, longest=longest,
+                source=np.array( [ source.get( 'size', -1 ), source.get( 'mtime', -1 ) ] ), digest=np.array( source.get( 'sha256', '' ) ) )
+
+  #Carga una tabla guardada; devuelve None si no existe o si no corresponde a 'snapshot'.
+  @classmethod
+  def load( cls, path, snapshot = None ):
+    try:
+      table = np.load( path )
+    except OSError:
+      return None
+    if snapshot:
+      size, mtime = table['source'].tolist()
+      if not matches( { 'size': size, 'mtime': mtime, 'sha256': str( table['digest'] ) }, os.path.join( snapshot, 'weights.npy' ) ): return None
+    longest = [ ( float( d ), str( s ), str( t ) ) for d, s, t in table['longest'].tolist() ]
+    return cls( table['codes'], table['eccentricity'], table['farthest'], longest )
+
+
+#Recorre los orígenes [start, stop) y devuelve sus excentricidades, sus vértices más lejanos y
+#un montículo acotado con los k pares (origen < destino) más distantes del bloque.
+def _run( task ):
+  start, stop, k = task
+  graph = attached()
+  eccentricity = np.zeros( stop - start )
+  farthest = np.full( stop - start, -1, dtype=np.int64 )
+  longest: list[tuple[float, int, int]] = []
+
+  for source in range( start, stop ):
+    distances = np.asarray( graph.shortestPathTree( source )[0] )
+    distances[ ~np.isfinite( distances ) ] = -1 #Vértices de otras componentes.
+    distances[source] = -1
+    target = int( distances.argmax() )
+    if distances[target] > 0:
+      eccentricity[ source - start ], farthest[ source - start ] = distances[target], target
+
+    distances[ :source ] = -1 #Cada par no dirigido se cuenta una sola vez.
+    candidates = np.argpartition( distances, -k )[-k:] if len( distances ) > k else np.arange( len( distances ) )
+    for target in candidates.tolist():
+      if distances[target] <= 0: continue
+      entry = ( float( distances[target] ), source, target )
+      if len( longest ) < k: heapq.heappush( longest, entry )
+      elif entry > longest[0]: heapq.heapreplace( longest, entry )
+
+  return start, eccentricity, farthest, longest
+
+#Calcula la tabla para la instantánea en 'snapshot' repartiendo los orígenes entre 'workers'
+#procesos. Si 'output' ya tiene una tabla calculada para esa instantánea (con al menos 'k' caminos),
+#la reutiliza; si no, guarda allí la nueva.
+def compute( snapshot, k = 10, workers = None, output = None ) -> EccentricityTable:
+  if output:
+    table = EccentricityTable.load( output, snapshot )
+    if table is not None and len( table.longest ) >= k:
+      table.longest = table.longest[:k]
+      return table
+
+  graph = CompactGraph.load( snapshot )
+  size = len( graph )
+  workers = workers or os.cpu_count() or 1
+  step = blockSize( size, workers )
+
+  eccentricity = np.zeros( size )
+  farthest = np.full( size, -1, dtype=np.int64 )
+  longest: list[tuple[float, int, int]] = []
+  with ProcessPoolExecutor( workers, initializer=attach, initargs=( snapshot, ) ) as pool:
+    for start, blockEccentricity, blockFarthest, blockLongest in pool.map( _run, [ ( i, min( i + step, size ), k ) for i in range( 0, size, step ) ] ):
+      eccentricity[ start:start + len( blockEccentricity ) ] = blockEccentricity
+      farthest[ start:start + len( blockFarthest ) ] = blockFarthest
+      longest = heapq.nlargest( k, longest + blockLongest )
+
+  codes = np.array( graph.columns[graph.identifier] )
+  table = EccentricityTable( codes, eccentricity, farthest, [ ( d, str( codes[s] ), str( codes[t] ) ) for d, s, t in longest ] )
+  if output: table.save( output, snapshot )
+  return table
+
+#Calcula la tabla para un 'Graph' en memoria, guardando antes una instantánea temporal. Con
+#'output' la tabla también se guarda en ese archivo (sin validación posterior contra el grafo,
+#porque la instantánea temporal se borra).
+def fromGraph( graph, k = 10, workers = None, output = None ) -> EccentricityTable:
+  with TemporaryDirectory() as snapshot:
+    graph.save( snapshot )
+    table = compute( snapshot, k, workers )
+  if output: table.save( output )
+  return table
@@ -0,0 +1,100 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+class QueryCancelled( Exception ):
+  #Se lanza dentro de una consulta cuando otra más nueva la reemplaza.
+  pass
+
+class Query:
+  #Consulta en curso: permite cancelarla y que informe su avance desde el hilo de trabajo.
+  def __init__( self, key ):
+    self.key = key
+    self.cancelled = threading.Event() #Las búsquedas del grafo lo revisan con su parámetro 'cancel'.
+    self.progress: float | None = None #Avance entre 0 y 1, o None si es indeterminado.
+    self.future = None
+
+  #Informa el avance (se muestra en la barra de progreso en el próximo sondeo).
+  def report( self, fraction: float ):
+    self.progress = fraction
+
+  def cancel( self ):
+    self.cancelled.set()
+    self.future.cancel()
+
+
+class QueryExecutor:
+  #Ejecuta los cálculos del grafo en un hilo de trabajo (uno solo, porque las cachés del grafo no
+  #son seguras entre hilos) y entrega los resultados al bucle de Tk sondeando con 'after()'.
+  #Cada consulta tiene una clave: una consulta nueva con la misma clave cancela la anterior.
+  def __init__( self, widget, progressBar = None, interval: int = 50 ):
+    self.widget = widget #Widget usado para programar el sondeo con 'after()'.
+    self.progressBar = progressBar
+    self.interval = interval #Milisegundos entre sondeos.
+    self.pool = ThreadPoolExecutor( 1, thread_name_prefix='graph' )
+    self.queries: dict = {} #Clave -> ( consulta, al terminar, al fallar ).
+    self._polling = False
+
+  #Envía 'function( query )' al hilo de trabajo; 'done( resultado )' o 'error( excepción )' se
+  #llaman desde el bucle de Tk.
+  def submit( self, key, function, done, error = None ) -> Query:
+    self.cancel( key )
+    query = Query( key )
+    query.future = self.pool.submit( function, query )
+    self.queries[key] = ( query, done, error or self.showError )
+
+    if not self._polling:
+      self._polling = True
+      if self.progressBar is not None:
+        self.progressBar.grid()
+        self.progressBar.configure( mode='indeterminate' )
+        self.progressBar.start()
+      self.widget.after( self.interval, self._poll )
+    return query
+
+  #Cancela la consulta con esa clave, si hay una; su resultado se descarta.
+  def cancel( self, key ):
+    if key in self.queries: self.queries.pop( key )[0].cancel()
+
+  #Entrega los resultados listos. Un fallo en 'done' o 'error' se muestra con 'showError' y no
+  #detiene el sondeo: las demás consultas se siguen entregando.
+  def _poll( self ):
+    try:
+      for key, ( query, done, error ) in list( self.queries.items() ):
+        if not query.future.done(): continue
+        del self.queries[key]
+        if query.future.cancelled() or isinstance( query.future.exception(), QueryCancelled ): continue
+        try:
+          if query.future.exception() is not None: error( query.future.exception() )
+          else: done( query.future.result() )
+        except Exception as exception:
+          self.showError( exception )
+      self._showProgress()
+    finally:
+      if self.queries: self.widget.after( self.interval, self._poll )
+      else: self._polling = False
+
+  #Barra determinada si alguna consulta informa su avance; indeterminada si no.
+  def _showProgress( self ):
+    if self.progressBar is None: return
+    if not self.queries:
+      self.progressBar.stop()
+      self.progressBar.grid_remove()
+      return
+    progress = [ query.progress for query, _, _ in self.queries.values() if query.progress is not None ]
+    if progress:
+      self.progressBar.stop()
+      self.progressBar.configure( mode='determinate' )
+      self.progressBar.set( min( progress ) )
+    elif self.progressBar.cget( 'mode' ) != 'indeterminate':
+      self.progressBar.configure( mode='indeterminate' )
+      self.progressBar.start()
+
+  def showError( self, exception ):
+    from tkinter import messagebox
+    messagebox.showerror( 'Error', str( exception ) )
+
+  #Cancela todo y libera el hilo de trabajo.
+  def shutdown( self ):
+    for key in list( self.queries ): self.cancel( key )
+    self.pool.shutdown( wait=False, cancel_futures=True )
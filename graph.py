@@ -1,20 +1,44 @@
 from __future__ import annotations
-from numpy import infty, zeros
+import numpy as np
 from math import *
-import graphviz as gv
 from typing import Any
+from bisect import bisect_left
+from compact import CompactGraph
+from connectivity import SpanningForest
+from cache import ShortestPathCache
+from hierarchy import ContractionHierarchy
+from spatial import SpatialIndex
+from path import Path
+from executor import QueryCancelled
+import instrument
 import heapq
 
+#Fórmula de Haversine sobre arreglos de coordenadas en radianes; devuelve kilómetros.
+def haversine( lt0, ln0, ltf, lnf ):
+  earth_radius = 6371 # Radio medio de la Tierra en kilómetros
+  a = np.sin( ( ltf - lt0 ) / 2 )**2 + np.cos( lt0 ) * np.cos( ltf ) * np.sin( ( lnf - ln0 ) / 2 )**2
+  return earth_radius * 2 * np.arctan2( np.sqrt( a ), np.sqrt( 1 - a ) )
+
 class Graph:
 
   #Inicializa las listas de vértices y aristas.
   def __init__( self ):
     self._vertices: list[Graph.Vertex] = []
-    self._edges: list[Graph.Edge] = []
+    self._edges: dict[Graph.Edge, None] = {} #Conjunto ordenado de aristas (una por ruta), con borrado en O(1).
     self.identifier = 'Code' #Define un identificador predeterminado para los vértices.
+    self._index: dict[Any, Graph.Vertex] = {} #Índice hash del identificador al vértice.
+    self._secondary: dict[str, dict[str, list[Graph.Vertex]]] = { 'City': {}, 'Country': {}, 'Name': {} } #Índices secundarios (valor normalizado -> vértices).
+    self._sortedKeys: dict[str, list[str]] = {} #Claves ordenadas de cada índice secundario para la búsqueda por prefijo.
+    self._summary: SpanningForest | None = None #Resumen de conectividad en caché.
+    self.pathCache = ShortestPathCache() #Árboles de caminos mínimos recientes por origen (tamaño y memoria configurables).
+    self._coordinates = None #Identificadores ordenados y sus coordenadas en radianes, para los cálculos vectorizados.
+    self._rows: dict[Any, int] | None = None #Fila de cada vértice en las matrices de costos.
+    self._spatial: tuple[SpatialIndex, list[Graph.Vertex]] | None = None #Índice espacial y vértices en su orden, creado en la primera consulta.
+    self.hierarchy: ContractionHierarchy | None = None #Jerarquía de contracción opcional ('contract'); se descarta si el grafo cambia.
+    self.networkLayer = None #Capa de mapa precalculada ('render.NetworkLayer'); se descarta si el grafo cambia.
 
   # Devuelve una representación en cadena del grafo.
-  def __repr__( self ): return f"Graph: ( \n \t Vertices: { self._vertices }, \n \t Edges: { self._edges } \n)"
+  def __repr__( self ): return f"Graph: ( \n \t Vertices: { self._vertices }, \n \t Edges: { list( self._edges ) } \n)"
 
   @property
   #Devuelve una copia de la lista de vértices
@@ -26,19 +50,62 @@ class Graph:
 
   @property
   #Devuelve una copia de la lista de aristas.
-  def edges( self ) -> list[Graph.Edge] : return self._edges.copy()
+  def edges( self ) -> list[Graph.Edge] : return list( self._edges )
 
   @property
-  #Calcula y devuelve una matriz de costos entre los vértices.
-  def costMatrix( self ) -> list[list[int]]:
-    vertexNumber = len(self._vertices)
-    matrix = [ [ 0 for i in range( vertexNumber ) ] for j in range( vertexNumber ) ]
-    for edge in self.edges:
-      i, j = self.vertices.index( edge.vertices[0] ), self._vertices.index( edge.vertices[1] )
-      matrix[i][j] = matrix[j][i] = edge.weight
+  #Matriz de costos densa entre los vértices (en el orden de 'vertices'), con 0 donde no hay ruta.
+  def costMatrix( self ) -> np.ndarray:
+    return self.denseCostMatrix( dtype=np.float64 )
+
+  #Fila de cada vértice en las matrices de costos (su posición en 'vertices'), por identificador.
+  def rows( self ) -> dict[Any, int]:
+    if self._rows is None:
+      self._rows = { v.data[self.identifier]: i for i, v in enumerate( self._vertices ) }
+    return self._rows
+
+  #Entradas de la matriz de costos en formato COO: arreglos ( filas, columnas, pesos ) con ambas
+  #direcciones de cada ruta. Si hay varias rutas entre dos vértices queda la última agregada.
+  def costEntries( self ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rows = self.rows()
+    sources = np.fromiter( ( rows[ e.vertices[0].data[self.identifier] ] for e in self._edges ), dtype=np.int64, count=len( self._edges ) )
+    destinations = np.fromiter( ( rows[ e.vertices[1].data[self.identifier] ] for e in self._edges ), dtype=np.int64, count=len( self._edges ) )
+    weights = np.fromiter( ( e.weight for e in self._edges ), dtype=np.float64, count=len( self._edges ) )
+
+    #Celdas repetidas: se conserva la última aparición (la primera en el orden invertido).
+    tails, heads = np.concatenate( ( sources, destinations ) )[::-1], np.concatenate( ( destinations, sources ) )[::-1]
+    _, first = np.unique( tails * len( rows ) + heads, return_index=True )
+    return tails[first], heads[first], np.concatenate( ( weights, weights ) )[::-1][first]
+
+  #Matriz de costos dispersa de SciPy ('csr', 'csc' o 'coo'), sin crecimiento cuadrático. SciPy es
+  #opcional: si no está instalado devuelve los arreglos del mismo formato, para 'coo' los de
+  #'costEntries' ( filas, columnas, pesos ) y para 'csr' y 'csc' ( indptr, indices, data ), que
+  #son iguales en ambos por ser la matriz simétrica. Otro formato es un ValueError.
+  def sparseCostMatrix( self, format = 'csr' ):
+    if format not in ( 'csr', 'csc', 'coo' ): raise ValueError( f"Formato de matriz dispersa no soportado: {format!r} (se admite 'csr', 'csc' o 'coo')." )
+    rows, columns, weights = self.costEntries()
+    try:
+      from scipy.sparse import coo_matrix
+    except ImportError:
+      if format == 'coo': return rows, columns, weights
+      #Las entradas ya vienen ordenadas por fila y columna ('costEntries' usa np.unique).
+      indptr = np.zeros( len( self._vertices ) + 1, dtype=np.int64 )
+      np.cumsum( np.bincount( rows, minlength=len( self._vertices ) ), out=indptr[1:] )
+      return indptr, columns, weights
+    return coo_matrix( ( weights, ( rows, columns ) ), shape=( len( self._vertices ), ) * 2 ).asformat( format )
+
+  #Matriz de costos densa como arreglo de NumPy ('float32' por defecto). Con 'path' se escribe
+  #como archivo .npy mapeado en memoria, que luego se puede abrir con np.load( path, mmap_mode='r' ).
+  def denseCostMatrix( self, path = None, dtype = np.float32 ) -> np.ndarray:
+    shape = ( len( self._vertices ), ) * 2
+    matrix = np.lib.format.open_memmap( path, mode='w+', dtype=dtype, shape=shape ) if path else np.zeros( shape, dtype=dtype )
+    rows, columns, weights = self.costEntries()
+    matrix[ rows, columns ] = weights
+    if path: matrix.flush()
     return matrix
 
   class Vertex:
+    __slots__ = ( 'data', 'identifier', 'edges' )
+
     #Inicializa los datos del vértice, su identificador y una lista de aristas conectadas a él.
     def __init__( self, data ):
       self.data: dict = data
@@ -75,6 +142,7 @@ class Graph:
       return hash(str(self.data[self.identifier]))
 
   class Edge:
+    __slots__ = ( 'vertices', 'weight' )
 
     #Inicializa los vértices de origen y destino y el peso de la arista.
     def __init__( self, fromVertex: Graph.Vertex, toVertex: Graph.Vertex, weight ):
@@ -84,9 +152,51 @@ class Graph:
     def __repr__( self ):
       return f"( {self.weight}:{self.vertices[0]} <-> {self.vertices[1]} )"
 
+  #Registra un vértice en el índice principal y en los secundarios.
+  def _indexVertex( self, vertex ):
+    self._index[ vertex.data[self.identifier] ] = vertex
+    for field, index in self._secondary.items():
+      if field in vertex.data:
+        index.setdefault( str( vertex.data[field] ).casefold(), [] ).append( vertex )
+
+  #Descarta los datos derivados de los vértices y rutas; se reconstruyen la próxima vez que se usan.
+  def invalidate( self ):
+    self._sortedKeys.clear() #Las claves ordenadas se reconstruyen en la próxima búsqueda por prefijo.
+    self._coordinates = None
+    self._spatial = None
+    self._rows = None
+    self.pathCache.clear() #Los árboles de caminos mínimos dejan de ser válidos.
+    self.hierarchy = None
+    self.networkLayer = None
+
   #Agrega un nuevo vértice al grafo.
   def newVertex( self, data ):
-    self._vertices.append( self.Vertex( data ) )
+    self.addVertex( self.Vertex( data ) )
+
+  #Construye un 'Graph' a partir de un 'CompactGraph' (por ejemplo, una instantánea cargada).
+  @classmethod
+  def fromCompact( cls, compact: CompactGraph ):
+    graph = cls()
+    graph.identifier = compact.identifier
+    fields = list( compact.columns )
+    graph.newVertices( dict( zip( fields, row ) ) for row in zip( *[ column.tolist() for column in compact.columns.values() ] ) )
+
+    codes = compact.columns[compact.identifier]
+    sources = np.repeat( np.arange( len( compact ) ), np.diff( compact.offsets ) )
+    forward = sources < compact.targets #Una media arista por ruta.
+    graph.newEdges( codes[ sources[forward] ].tolist(), codes[ compact.targets[forward] ].tolist(), compact.weights[forward].tolist() )
+    return graph
+
+  #Guarda el grafo como instantánea binaria en 'directory'. Si se indica 'source' (el CSV de
+  #origen), se guarda su huella para invalidar la instantánea cuando el archivo cambie.
+  def save( self, directory, source = None ):
+    CompactGraph.fromGraph( self ).save( directory, source )
+
+  #Carga un grafo desde una instantánea; devuelve None si no existe o está desactualizada.
+  @classmethod
+  def load( cls, directory, source = None ):
+    compact = CompactGraph.load( directory, source )
+    return cls.fromCompact( compact ) if compact is not None else None
 
   #Agrega una nueva arista entre dos vértices con un peso dado.
   def newEdge( self, source: str, destination: str, weight: float ):
@@ -99,31 +209,121 @@ class Graph:
     source.edges.append( edge )
     destination.edges.append( self.Edge( destination, source, weight ) )
 
-    self._edges.append( edge )
+    self._edges[ edge ] = None
+    if self._summary is not None: self._summary.addEdge( source, destination, weight ) #Actualiza componentes y árboles.
+    self.pathCache.clear()
+    self.hierarchy = None
+    self.networkLayer = None
+
+  #Quita la ruta entre dos vértices (la primera, si hay varias) y devuelve su arista, o None si no existe.
+  def removeEdge( self, source: str, destination: str ):
+
+    source = self.getVertex(source)
+    destination = self.getVertex(destination)
+    if source is None or destination is None: return None
+
+    edge = next( ( e for e in source.edges if e.vertices[1] is destination ), None )
+    if edge is None: return None
+    #En un lazo ambas medias aristas están en la misma lista: la inversa es la otra.
+    reverse = next( e for e in destination.edges if e is not edge and e.vertices[1] is source and e.weight == edge.weight )
+
+    source.edges.remove( edge )
+    destination.edges.remove( reverse )
+    canonical = edge if edge in self._edges else reverse #La media arista registrada en '_edges'.
+    del self._edges[ canonical ]
+
+    if self._summary is not None: self._summary.removeEdge( source, destination, edge.weight ) #Reparación local del árbol.
+    self.pathCache.clear()
+    self.hierarchy = None
+    self.networkLayer = None
+    return canonical
+
+  #Quita un vértice junto con todas sus rutas y devuelve sus datos, o None si no existe.
+  def removeVertex( self, value ):
+    vertex = self.getVertex( value )
+    if vertex is None: return None
+
+    while vertex.edges:
+      self.removeEdge( value, vertex.edges[-1].vertices[1].data[self.identifier] )
+
+    del self._vertices[ next( i for i, v in enumerate( self._vertices ) if v is vertex ) ]
+    del self._index[ vertex.data[self.identifier] ]
+    for field, index in self._secondary.items():
+      if field in vertex.data:
+        key = str( vertex.data[field] ).casefold()
+        index[key] = [ v for v in index[key] if v is not vertex ]
+        if not index[key]: del index[key]
+    self.invalidate()
+
+    if self._summary is not None: self._summary.removeVertex( vertex )
+    return vertex.data
+
+  #Agrega en bloque una lista de vértices (diccionarios de datos). Con invalidate=False los datos
+  #derivados no se descartan: quien carga por partes llama a 'invalidate' una vez al terminar.
+  def newVertices( self, records, invalidate = True ):
+    for data in records:
+      self._vertices.append( self.Vertex( data ) )
+      self._indexVertex( self._vertices[-1] )
+    self._summary = None #En bloque conviene recalcular el resumen.
+    if invalidate: self.invalidate()
+
+  #Agrega en bloque aristas a partir de arreglos de códigos de origen, destino y pesos ('invalidate'
+  #como en 'newVertices').
+  def newEdges( self, sources, destinations, weights, invalidate = True ):
+    index = self._index
+
+    for source, destination, weight in zip( sources, destinations, weights ):
+      source = index[source]
+      destination = index[destination]
+
+      edge = self.Edge( source, destination, weight )
+
+      source.edges.append( edge )
+      destination.edges.append( self.Edge( destination, source, weight ) )
+
+      self._edges[ edge ] = None
+    self._summary = None #En bloque conviene recalcular el resumen.
+    if invalidate:
+      self.pathCache.clear()
+      self.hierarchy = None
+      self.networkLayer = None
 
   #Obteniene un vértice específico según su valor.
   def getVertex( self, value ):
-    left = 0 #índice izquierdo al comienzo de la lista de vértices.
-    right = len( self.vertices ) - 1 #índice derecho al final de la lista de vértices.
-
-    #Búsqueda binaria para encontrar el vértice
-    while left <= right:
-        mid = left + (right - left) // 2 #índice medio del rango actual.
-        vertex = self.vertices[mid].data[self.identifier]
-        if vertex == value: return self.vertices[mid]
-        elif vertex < value: left = mid + 1
-        else: right = mid - 1
-    return None
+    return self._index.get( value )
+
+  #Obtiene los vértices cuyo campo ('City', 'Country' o 'Name') coincide exactamente con el valor.
+  def findVertices( self, field, value ):
+    return self._secondary[field].get( str( value ).casefold(), [] ).copy()
+
+  #Obtiene los vértices cuyo campo ('City', 'Country' o 'Name') comienza con el prefijo dado.
+  def searchVertices( self, field, prefix ):
+    index = self._secondary[field]
+    if field not in self._sortedKeys: self._sortedKeys[field] = sorted( index )
+    keys = self._sortedKeys[field]
+
+    prefix = str( prefix ).casefold()
+    vertices = []
+    i = bisect_left( keys, prefix ) #Primera clave mayor o igual al prefijo.
+    while i < len( keys ) and keys[i].startswith( prefix ):
+      vertices.extend( index[ keys[i] ] )
+      i += 1
+    return vertices
 
   def addVertex( self, vertex ):
     self._vertices.append( vertex )
+    self._indexVertex( vertex )
+    self.invalidate()
+    if self._summary is not None: self._summary.addVertex( vertex )
 
 
   #Calcula la distancia entre dos vértices en coordenadas geográficas.
   def distance( self, source, destination ):
 
-    source = self.getVertex( source )
-    destination = self.getVertex( destination )
+    return self._arc( self.getVertex( source ), self.getVertex( destination ) )
+
+  #Distancia de Haversine entre dos objetos vértice.
+  def _arc( self, source, destination ):
 
     # Radio medio de la Tierra en kilómetros
     earth_radius = 6371
@@ -144,6 +344,50 @@ class Graph:
 
     return earth_radius * c # Distancia en kilómetros.
 
+  #Obtiene la latitud y longitud en radianes de un arreglo de identificadores.
+  def coordinates( self, values ):
+    if self._coordinates is None:
+      codes = np.array( [ v.data[self.identifier] for v in self._vertices ] )
+      order = np.argsort( codes, kind='stable' )
+      self._coordinates = (
+        codes[order],
+        np.radians( np.array( [ self._vertices[i].data['Latitude'] for i in order ], dtype=float ) ),
+        np.radians( np.array( [ self._vertices[i].data['Longitude'] for i in order ], dtype=float ) ),
+      )
+    codes, latitudes, longitudes = self._coordinates
+
+    values = np.asarray( values )
+    if values.dtype == object: values = values.astype( str )
+    rows = np.searchsorted( codes, values ).clip( 0, len( codes ) - 1 )
+    missing = codes[rows] != values
+    if np.any( missing ): raise KeyError( f"Vértices inexistentes: { np.unique( values[missing] )[:10].tolist() }" )
+    return latitudes[rows], longitudes[rows]
+
+  #Índice espacial de los vértices (se reconstruye cuando cambian los vértices).
+  def spatialIndex( self ) -> tuple[SpatialIndex, list[Graph.Vertex]]:
+    if self._spatial is None:
+      vertices = self._vertices.copy()
+      self._spatial = ( SpatialIndex( [ v.data['Latitude'] for v in vertices ], [ v.data['Longitude'] for v in vertices ] ), vertices )
+    return self._spatial
+
+  #Los 'k' vértices más cercanos a una ubicación, como ( vértice, kilómetros ) de menor a mayor distancia.
+  def nearest( self, latitude, longitude, k = 1 ) -> list[tuple[Graph.Vertex, float]]:
+    index, vertices = self.spatialIndex()
+    return [ ( vertices[i], km ) for i, km in index.nearest( latitude, longitude, k ) ]
+
+  #Los vértices a no más de 'km' kilómetros de una ubicación, como ( vértice, kilómetros ) de menor a mayor distancia.
+  def withinRadius( self, latitude, longitude, km ) -> list[tuple[Graph.Vertex, float]]:
+    index, vertices = self.spatialIndex()
+    return [ ( vertices[i], distance ) for i, distance in index.withinRadius( latitude, longitude, km ) ]
+
+  #Calcula en un solo paso vectorizado las distancias entre arreglos de orígenes y destinos.
+  #Los arreglos se combinan con las reglas de 'broadcasting' de NumPy, por lo que sirve tanto
+  #para pares (origen, destino) como para consultas de uno a todos o de muchos a muchos.
+  def distances( self, sources, destinations ) -> np.ndarray:
+    lt0, ln0 = self.coordinates( sources )
+    ltf, lnf = self.coordinates( destinations )
+    return haversine( lt0, ln0, ltf, lnf )
+
 
   #Obtiene una lista de rutas en el grafo.
   def getRoutes( self ):
@@ -154,99 +398,203 @@ class Graph:
       route = {
           'Source': ( s['Latitude'], s['Longitude'] ),
           'Destination': ( d['Latitude'], d['Longitude'] ),
-          'Weight': e.weight
+          'Weight': e.weight,
+          'Codes': ( s[self.identifier], d[self.identifier] )
           }
       routes.append(route)
     return routes
 
   #Algoritmo de Dijkstra para encontrar los caminos más corto desde un vértice de inicio.
-  def dijkstra( self, start ):
-
-    paths = { v: ( infty, None ) for v in self.vertices } #Diccionario para mantener las distancias más cortas y los predecesores.
-    paths[start] = ( 0, None ) #Distancia desde el vértice de inicio a sí mismo como 0 y sin predecesor.
-
-    toVisit = self.vertices #Lista con todos los vértices para visitar.
-    if start in toVisit: toVisit.remove( start ) #Elimina el vértice de inicio de la lista de vértices a visitar.
+  #Si se indica 'destination', se detiene en cuanto ese vértice queda definitivo y solo
+  #devuelve los vértices alcanzados hasta ese momento. Si se indica 'cancel' (un 'threading.Event'),
+  #la búsqueda se interrumpe con 'QueryCancelled' en cuanto se activa.
+  def dijkstra( self, start, destination = None, cancel = None ):
 
-    for e in start.edges:
-      paths[ e.vertices[1] ] = ( e.weight, start )
+    paths = { start: ( 0, None ) } #Diccionario para mantener las distancias más cortas y los predecesores.
+    toVisit = [ ( 0, 0, start ) ] #Cola de prioridad (distancia, orden de llegada, vértice).
+    pushes = 1 #Desempata entradas con igual distancia sin comparar vértices.
+    settled = 0
 
     while toVisit:
-      toVisit = sorted( toVisit, key = lambda x: paths[x] ) #Ordena la lista según distancias actuales.
-      min = toVisit.pop(0) #Vértice con la distancia más corta del vértice de inicio.
+      distance, _, min = heapq.heappop( toVisit ) #Vértice con la distancia más corta del vértice de inicio.
+
+      if distance > paths[min][0]: continue #Entrada obsoleta (borrado perezoso).
+      settled += 1
+      if min is destination: break #El destino ya es definitivo.
+      if cancel is not None and cancel.is_set(): raise QueryCancelled()
 
       #Recorre las aristas saliende de min.
       for e in min.edges:
-        if paths[min][0] + e.weight < paths[ e.vertices[1] ][0]:
-          paths[ e.vertices[1] ] = ( paths[min][0] + e.weight, min ) #Actualiza la distancia y el predecesor
+        neighbor = e.vertices[1]
+        if distance + e.weight < paths.get( neighbor, ( inf, None ) )[0]:
+          paths[ neighbor ] = ( distance + e.weight, min ) #Actualiza la distancia y el predecesor
+          heapq.heappush( toVisit, ( distance + e.weight, pushes, neighbor ) )
+          pushes += 1
 
-    return(paths)
+    if instrument.profiler: instrument.profiler.count( 'dijkstra', settled=settled, pushes=pushes )
 
-  #Determina el camino mínimo entre dos vértices.
-  def getPath( self, minpaths, source, destination ):
+    #En el recorrido completo, los vértices no alcanzados quedan con distancia infinita.
+    if destination is None:
+      paths = { v: paths.get( v, ( inf, None ) ) for v in self._vertices }
 
-    #Comprueba si el destino no está en 'minpaths' o si su distancia es infinita.
-    if not destination in minpaths or minpaths[destination] == ( infty, None ):
-      return f"{source} -/-> {destination} "
+    return(paths)
 
-    weight = minpaths[destination][0] #Peso del camino más corto desde el inicio hasta el destino.
-    path = f"{destination}" #Inicializa una cadena 'path' con el vértice de destino.
+  #Árbol de caminos mínimos completo desde 'start', reutilizado desde la caché LRU si ya se calculó.
+  def shortestPaths( self, start, cancel = None ):
+    paths = self.pathCache.get( start )
+    if paths is None:
+      paths = self.dijkstra( start, cancel=cancel )
+      self.pathCache.put( start, paths )
+    return paths
+
+  #Los 'k' vértices alcanzables más lejanos desde 'start' (de mayor a menor distancia) con sus
+  #caminos; la selección usa un montículo acotado y solo reconstruye esos 'k' caminos.
+  def farthest( self, start, k = 10, cancel = None ) -> list[Path]:
+    paths = self.shortestPaths( start, cancel )
+    reachable = ( v for v, ( distance, predecessor ) in paths.items() if predecessor is not None )
+    return [ Path.fromTree( paths, start, v ) for v in heapq.nlargest( k, reachable, key=lambda v: paths[v][0] ) ]
+
+  #Camino mínimo entre dos vértices: usa el árbol en caché de cualquiera de los extremos (el grafo
+  #no es dirigido); si no hay, la jerarquía de contracción ('contract', opcional en 'dataset.load')
+  #y, si no existe o el grafo cambió, A* bidireccional.
+  def route( self, source, destination, cancel = None ) -> Path:
+    for start, end in ( ( source, destination ), ( destination, source ) ):
+      if start in self.pathCache:
+        paths = self.pathCache.get( start )
+        path = Path.fromTree( paths, start, end )
+        return path if start is source else path.reversed()
+    if self.hierarchy is not None: return self._hierarchyRoute( source, destination )
+    return self.astar( source, destination, bidirectional=True, cancel=cancel )
+
+  #Construye la jerarquía de contracción que usa 'route'. Con 'directory' (normalmente el de la
+  #instantánea del grafo) la carga desde allí si corresponde a este grafo, o la guarda allí después
+  #de construirla.
+  def contract( self, directory = None ) -> ContractionHierarchy:
+    compact = CompactGraph.fromGraph( self )
+    self.hierarchy = ContractionHierarchy.open( directory, compact ) if directory else ContractionHierarchy.build( compact )
+    return self.hierarchy
+
+  #Consulta de camino mínimo sobre la jerarquía de contracción.
+  def _hierarchyRoute( self, source, destination ) -> Path:
+    codes = self.hierarchy.codes
+    distance, ids = self.hierarchy.query( self.hierarchy.index( source.data[self.identifier] ), self.hierarchy.index( destination.data[self.identifier] ) )
+    if not ids: return Path.unreachable( source, destination )
+    return Path.fromVertices( [ self._index[ codes[i].item() ] for i in ids ], distance )
+
+  #Recorre los predecesores de 'labels' desde 'vertex' y devuelve el camino desde la raíz.
+  def _walk( self, labels, vertex ) -> list[Graph.Vertex]:
+    path = [ vertex ]
+    while labels[ path[-1] ][1] is not None: path.append( labels[ path[-1] ][1] )
+    return path[::-1]
+
+  #Algoritmo A* entre dos vértices, guiado por la distancia de Haversine al destino (una cota
+  #inferior de cualquier ruta, ya que los pesos son distancias de Haversine).
+  #Con 'bidirectional' busca a la vez desde ambos extremos.
+  def astar( self, source, destination, bidirectional = False, cancel = None ) -> Path:
+    if bidirectional: return self._bidirectionalAstar( source, destination, cancel )
+
+    estimates = {} #Cota inferior al destino de cada vértice, calculada una sola vez.
+    paths = { source: ( 0, None ) }
+    toVisit = [ ( self._arc( source, destination ), 0, 0, source ) ] #( distancia + cota, orden de llegada, distancia, vértice ).
+    pushes = 1
+    settled = 0
 
-    #Mientras el vértice actual no sea igual al vértice de inicio.
-    while not source == destination:
-      destination = minpaths[destination][1] #Obtiene el predecesor del vértice actual.
-      path = f"{destination} -> " + path #Agrega el vértice actual al camino.
+    while toVisit:
+      _, _, distance, min = heapq.heappop( toVisit )
+      if distance > paths[min][0]: continue #Entrada obsoleta.
+      settled += 1
+      if min is destination:
+        if instrument.profiler: instrument.profiler.count( 'astar', settled=settled, pushes=pushes )
+        return Path.fromTree( paths, source, destination )
+      if cancel is not None and cancel.is_set(): raise QueryCancelled()
 
-    #Construye y devuelve una cadena que representa el camino más corto.
-    return f"({round(weight,3)}): " + path
+      for e in min.edges:
+        neighbor = e.vertices[1]
+        if distance + e.weight < paths.get( neighbor, ( inf, None ) )[0]:
+          paths[ neighbor ] = ( distance + e.weight, min )
+          if neighbor not in estimates: estimates[neighbor] = self._arc( neighbor, destination )
+          heapq.heappush( toVisit, ( distance + e.weight + estimates[neighbor], pushes, distance + e.weight, neighbor ) )
+          pushes += 1
+
+    if instrument.profiler: instrument.profiler.count( 'astar', settled=settled, pushes=pushes )
+    return Path.unreachable( source, destination )
+
+  #A* bidireccional con potenciales promediados: p(v) = ( h(v, destino) - h(v, origen) ) / 2 guía la
+  #búsqueda hacia adelante y -p(v) la búsqueda hacia atrás. La búsqueda termina cuando la suma de
+  #las claves mínimas de ambas colas alcanza al mejor camino encontrado.
+  def _bidirectionalAstar( self, source, destination, cancel = None ):
+    if source is destination: return Path( [ source ], [], 0 )
+
+    potentials = {}
+    def potential( v ):
+      if v not in potentials: potentials[v] = ( self._arc( v, destination ) - self._arc( v, source ) ) / 2
+      return potentials[v]
+
+    labels = ( { source: ( 0, None ) }, { destination: ( 0, None ) } ) #Distancias y predecesores de cada lado.
+    toVisit = ( [ ( potential( source ), 0, 0, source ) ], [ ( -potential( destination ), 0, 0, destination ) ] )
+    signs = ( 1, -1 )
+    best, meeting = inf, None
+    pushes = 1
+    settled = 0
+
+    while toVisit[0] and toVisit[1] and toVisit[0][0][0] + toVisit[1][0][0] < best:
+      side = 0 if toVisit[0][0][0] <= toVisit[1][0][0] else 1 #Avanza por la cola con menor clave.
+      _, _, distance, min = heapq.heappop( toVisit[side] )
+      if distance > labels[side][min][0]: continue #Entrada obsoleta.
+      settled += 1
+      if cancel is not None and cancel.is_set(): raise QueryCancelled()
 
-  #Visualización del mapa.
-  def display( self ):
+      for e in min.edges:
+        neighbor = e.vertices[1]
+        if distance + e.weight < labels[side].get( neighbor, ( inf, None ) )[0]:
+          labels[side][neighbor] = ( distance + e.weight, min )
+          heapq.heappush( toVisit[side], ( distance + e.weight + signs[side] * potential( neighbor ), pushes, distance + e.weight, neighbor ) )
+          pushes += 1
+        if neighbor in labels[1 - side] and distance + e.weight + labels[1 - side][neighbor][0] < best:
+          best = distance + e.weight + labels[1 - side][neighbor][0] #Camino que cruza por 'neighbor'.
+          meeting = neighbor
+
+    if instrument.profiler: instrument.profiler.count( 'astar', settled=settled, pushes=pushes )
+    if meeting is None: return Path.unreachable( source, destination )
+    forward = self._walk( labels[0], meeting )
+    backward = self._walk( labels[1], meeting )
+    return Path.fromVertices( forward + backward[::-1][1:], best )
+
+  #Determina el camino mínimo entre dos vértices a partir del resultado de 'dijkstra'.
+  def getPath( self, minpaths, source, destination ) -> Path:
+    return Path.fromTree( minpaths, source, destination )
+
+  #Visualización del mapa. Solo se dibujan los 'limit' vértices con más rutas y las rutas entre
+  #ellos: 'sfdp' no termina de ubicar la red completa.
+  def display( self, limit = 200 ):
+    import graphviz as gv
     plot = gv.Graph( comment = "Graph", engine = 'sfdp' )
-    for vertex in self.vertices:
-      plot.node( str(vertex) )
-    for edge in self.edges:
-      plot.edge( str(edge.vertices[0]), str(edge.vertices[1]), label = str(round(edge.weight,3)) )
+    shown = set( map( id, heapq.nlargest( limit, self._vertices, key=lambda v: len( v.edges ) ) ) )
+    for vertex in self._vertices:
+      if id( vertex ) in shown: plot.node( str(vertex) )
+    for edge in self._edges:
+      if id( edge.vertices[0] ) in shown and id( edge.vertices[1] ) in shown:
+        plot.edge( str(edge.vertices[0]), str(edge.vertices[1]), label = str(round(edge.weight,3)) )
     return plot
   
-  # Determina las componentes conectadas del grafo.
-  def _dfs(self, vertex: Graph.Vertex, visited: set) -> list[Graph.Vertex]:
-      stack = [vertex]  
-      component = []  # Lista para almacenar la componente conectada
-      veticesVisited = 0
-      while stack:
-          v = stack.pop()
-          if v not in visited:
-              visited.add(v)
-              veticesVisited += 1
-              component.append(v)
-              for edge in v.edges:
-                  # Asegúrate de que estás accediendo correctamente al otro vértice
-                  neighbor = edge.vertices[1] if edge.vertices[0] == v else edge.vertices[0]
-                  if neighbor not in visited:
-                      stack.append(neighbor)
-      return component
-
+  #Resumen de conectividad (componentes y pesos de los árboles de expansión mínima),
+  #calculado una sola vez y reutilizado hasta que el grafo cambie.
+  def summary( self ) -> SpanningForest:
+    if self._summary is None:
+      self._summary = SpanningForest( self._vertices, self._edges )
+    return self._summary
 
+  # Determina las componentes conectadas del grafo.
   def connectedComponents(self):
-      components = []  # Lista para almacenar las componentes conexas
-      visited = set()  # Conjunto para marcar los vértices visitados
-      for v in self.vertices:  # Recorre todos los vértices
-          if v not in visited:  # Si el vértice no ha sido visitado
-              component = self._dfs(v, visited)  # Realiza DFS para encontrar la componente
-              print(len(component))
-              if component:  
-                  components.append((component, len(component)))  # Agrega la componente y su tamaño
-      return components  # Devuelve la lista de componentes con sus tamaños
+      return [ ( component, len(component) ) for component in self.summary().components ]  # Lista de componentes con sus tamaños
 
 
   # Determina si el grafo es conexo.
   def isConnected(self) -> bool:
-      if not self.vertices:  # Cambié _vertices a vertices
+      if not self._vertices:
           return False 
 
-      components = self.connectedComponents()  # Obtiene las componentes conexas
-      return len(components) == 1  # Si hay una sola componente, el grafo es conexo
+      return self.summary().isConnected  # Si hay una sola componente, el grafo es conexo
 
 
      
@@ -282,13 +630,5 @@ class Graph:
   
   # Encuentra los árboles de expansión mínima de cada componente conexa
   def findMinimumSpanningTrees(self):
-        components = self.connectedComponents()  # Obtener las componentes conectadas
-        mst_weights = {}  # Diccionario para almacenar el peso del MST de cada componente
-
-        for component, _ in components:
-            # Tomar el primer vértice de la componente para iniciar Prim
-            start_vertex = component[0]
-            mst_weight = self.prim(start_vertex)
-            mst_weights[tuple(component)] = mst_weight  # Usamos la tupla del componente como clave
-
-        return mst_weights 
\ No newline at end of file
+        summary = self.summary()
+        return { tuple(component): weight for component, weight in zip(summary.components, summary.weights) }  # Usamos la tupla del componente como clave
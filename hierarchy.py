@@ -0,0 +1,214 @@
+from __future__ import annotations
+from compact import CompactGraph
+from math import inf
+import numpy as np
+import heapq
+import os
+
+class ContractionHierarchy:
+  #Jerarquía de contracción sobre un 'CompactGraph': los vértices se contraen de menos a más
+  #importante agregando atajos que preservan las distancias, y cada vértice guarda solo sus
+  #aristas hacia vértices más importantes (grafo ascendente, en formato CSR). Una consulta es
+  #una búsqueda bidireccional que solo sube en la jerarquía (y recorre libremente el núcleo de
+  #vértices no contraídos, si lo hay); luego los atajos se desarman.
+
+  VERSION = 1
+  FILE = 'hierarchy.npz' #Nombre del archivo dentro del directorio de la instantánea del grafo.
+
+  def __init__( self, codes: np.ndarray, rank: np.ndarray, offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray, middles: np.ndarray, signature: str ):
+    self.codes = codes #Identificador de cada vértice (mismo orden que el 'CompactGraph').
+    self.rank = rank #Orden de contracción de cada vértice.
+    self.offsets = offsets #Aristas ascendentes del vértice i: targets[offsets[i]:offsets[i+1]].
+    self.targets = targets
+    self.weights = weights
+    self.middles = middles #Vértice contraído que reemplaza cada atajo (-1 si es una ruta original).
+    self.signature = signature #Firma del grafo con el que se construyó.
+
+    self._offsets = memoryview( offsets )
+    self._targets = memoryview( targets )
+    self._weights = memoryview( weights )
+    self._middles = memoryview( middles )
+    self._edges: dict | None = None #( menor, mayor ) -> ( peso, intermedio ), para desarmar atajos.
+
+  #Contrae los vértices de 'graph'. La prioridad de cada vértice es su diferencia de aristas
+  #(atajos necesarios - aristas eliminadas) más sus vecinos ya contraídos, y se actualiza de
+  #forma perezosa. Las búsquedas de testigos se limitan a 'witnessLimit' vértices: si no
+  #encuentran un testigo se agrega el atajo, lo que nunca afecta la exactitud. Los vértices
+  #que llegan a tener más de 'coreDegree' rutas forman un núcleo sin contraer (contraerlos
+  #cuesta del orden del cuadrado de su grado), que la consulta recorre en ambos sentidos.
+  @classmethod
+  def build( cls, graph: CompactGraph, witnessLimit: int = 100, coreDegree: int = 64 ):
+    size = len( graph )
+    offsets, targets, weights = graph._offsets, graph._targets, graph._weights
+
+    #Grafo restante: vértice -> { vecino: ( peso, intermedio ) }, con la arista más liviana entre cada par.
+    adjacency: list[dict[int, tuple[float, int]]] = [ {} for _ in range( size ) ]
+    for v in range( size ):
+      for slot in range( offsets[v], offsets[v + 1] ):
+        if weights[slot] < adjacency[v].get( targets[slot], ( inf, ) )[0]:
+          adjacency[v][ targets[slot] ] = ( weights[slot], -1 )
+
+    #Distancias desde 'source' sin pasar por 'excluded', hasta agotar 'limit' o el presupuesto.
+    def witness( source, excluded, limit, pending ):
+      distances = { source: 0 }
+      toVisit = [ ( 0, source ) ]
+      settled = 0
+      while toVisit and pending and settled < witnessLimit:
+        distance, x = heapq.heappop( toVisit )
+        if distance > distances[x]: continue
+        settled += 1
+        pending.discard( x )
+        for y, ( weight, _ ) in adjacency[x].items():
+          if y != excluded and distance + weight <= limit and distance + weight < distances.get( y, inf ):
+            distances[y] = distance + weight
+            heapq.heappush( toVisit, ( distance + weight, y ) )
+      return distances
+
+    #Atajos ( u, x, peso ) necesarios al contraer 'v'.
+    def shortcuts( v ):
+      neighbors = [ ( u, weight ) for u, ( weight, _ ) in adjacency[v].items() ]
+      found = []
+      for i, ( u, toU ) in enumerate( neighbors ):
+        through = { x: toU + toX for x, toX in neighbors[i + 1:] } #Caminos u -> v -> x.
+        if not through: continue
+        distances = witness( u, v, max( through.values() ), set( through ) )
+        found.extend( ( u, x, weight ) for x, weight in through.items() if distances.get( x, inf ) > weight )
+      return found
+
+    contracted = [ 0 ] * size #Vecinos ya contraídos de cada vértice.
+    rank = np.zeros( size, dtype=np.int32 )
+    upward: list[list[tuple[int, float, int]]] = [ [] for _ in range( size ) ]
+    core = [] #Vértices que quedan sin contraer.
+    toContract = [ ( len( shortcuts( v ) ) - len( adjacency[v] ) if len( adjacency[v] ) <= coreDegree else len( adjacency[v] ), v ) for v in range( size ) ]
+    heapq.heapify( toContract )
+
+    order = 0
+    while toContract:
+      _, v = heapq.heappop( toContract )
+      if len( adjacency[v] ) > coreDegree:
+        core.append( v )
+        continue
+      found = shortcuts( v )
+      priority = len( found ) - len( adjacency[v] ) + contracted[v]
+      if toContract and priority > toContract[0][0]:
+        heapq.heappush( toContract, ( priority, v ) ) #La prioridad cambió: se reevalúa más tarde.
+        continue
+
+      rank[v] = order
+      order += 1
+      upward[v] = [ ( u, weight, middle ) for u, ( weight, middle ) in adjacency[v].items() ]
+      for u in adjacency[v]:
+        del adjacency[u][v]
+        contracted[u] += 1
+      for u, x, weight in found:
+        if weight < adjacency[u].get( x, ( inf, ) )[0]:
+          adjacency[u][x] = adjacency[x][u] = ( weight, v )
+      adjacency[v] = {}
+
+    #El núcleo conserva todas sus aristas entre sí, en ambos sentidos.
+    for v in core:
+      rank[v] = order
+      upward[v] = [ ( u, weight, middle ) for u, ( weight, middle ) in adjacency[v].items() ]
+
+    counts = np.array( [ len( edges ) for edges in upward ], dtype=np.int64 )
+    upwardOffsets = np.zeros( size + 1, dtype=np.int64 )
+    np.cumsum( counts, out=upwardOffsets[1:] )
+    edges = [ edge for vertexEdges in upward for edge in vertexEdges ]
+    return cls(
+      np.array( graph.columns[graph.identifier] ),
+      rank,
+      upwardOffsets,
+      np.array( [ e[0] for e in edges ], dtype=np.int32 ),
+      np.array( [ e[1] for e in edges ], dtype=np.float64 ),
+      np.array( [ e[2] for e in edges ], dtype=np.int32 ),
+      graph.signature(),
+    )
+
+  #Guarda la jerarquía en 'path' (.npz), normalmente junto a la instantánea del grafo.
+  def save( self, path ):
+    with open( path, 'wb' ) as file:
+      np.savez( file, version=self.VERSION, codes=self.codes, rank=self.rank, offsets=self.offsets, targets=self.targets,
+                weights=self.weights, middles=self.middles, signature=np.array( self.signature ) )
+
+  #Carga una jerarquía guardada; devuelve None si no existe, es de otra versión o se construyó
+  #para un grafo distinto de 'graph'.
+  @classmethod
+  def load( cls, path, graph: CompactGraph ):
+    try:
+      data = np.load( path )
+    except OSError:
+      return None
+    if int( data['version'] ) != cls.VERSION or str( data['signature'] ) != graph.signature(): return None
+    return cls( data['codes'], data['rank'], data['offsets'], data['targets'], data['weights'], data['middles'], str( data['signature'] ) )
+
+  #Jerarquía de 'graph' guardada en 'directory' (el de la instantánea del grafo) o, si no hay una
+  #vigente, la construye y la guarda allí.
+  @classmethod
+  def open( cls, directory, graph: CompactGraph ):
+    path = os.path.join( directory, cls.FILE )
+    hierarchy = cls.load( path, graph )
+    if hierarchy is None:
+      hierarchy = cls.build( graph )
+      os.makedirs( directory, exist_ok=True )
+      hierarchy.save( path )
+    return hierarchy
+
+  #Posición de un identificador, o -1 si no existe.
+  def index( self, code ) -> int:
+    i = int( np.searchsorted( self.codes, code ) )
+    return i if i < len( self.codes ) and self.codes[i] == code else -1
+
+  #Reemplaza recursivamente el tramo a-b por las rutas originales; agrega ( vértice, peso ) a 'hops'.
+  def _unpack( self, a, b, hops ):
+    if self._edges is None:
+      self._edges = {}
+      for v in range( len( self.codes ) ):
+        for slot in range( self._offsets[v], self._offsets[v + 1] ):
+          self._edges[ ( min( v, self._targets[slot] ), max( v, self._targets[slot] ) ) ] = ( self._weights[slot], self._middles[slot] )
+
+    stack = [ ( a, b ) ]
+    while stack:
+      a, b = stack.pop()
+      weight, middle = self._edges[ ( min( a, b ), max( a, b ) ) ]
+      if middle < 0: hops.append( ( b, weight ) )
+      else: stack.extend( ( ( middle, b ), ( a, middle ) ) )
+
+  #Camino mínimo entre dos posiciones: devuelve ( distancia, posiciones del camino ). La distancia
+  #se suma tramo a tramo sobre las rutas originales, en el mismo orden que 'dijkstra'.
+  def query( self, source: int, target: int ):
+    if source == target: return 0, [ source ]
+    offsets, targets, weights = self._offsets, self._targets, self._weights
+    distances = ( { source: 0 }, { target: 0 } )
+    parents = ( { source: -1 }, { target: -1 } )
+    toVisit = ( [ ( 0, source ) ], [ ( 0, target ) ] )
+    best, meeting = inf, -1
+
+    while toVisit[0] or toVisit[1]:
+      side = 0 if toVisit[0] and ( not toVisit[1] or toVisit[0][0][0] <= toVisit[1][0][0] ) else 1
+      distance, v = heapq.heappop( toVisit[side] )
+      if distance > distances[side][v]: continue
+      if distance >= best:
+        toVisit[side].clear() #Este lado ya no puede mejorar el camino.
+        continue
+      if v in distances[1 - side] and distance + distances[1 - side][v] < best:
+        best, meeting = distance + distances[1 - side][v], v
+
+      for slot in range( offsets[v], offsets[v + 1] ):
+        u = targets[slot]
+        if distance + weights[slot] < distances[side].get( u, inf ):
+          distances[side][u] = distance + weights[slot]
+          parents[side][u] = v
+          heapq.heappush( toVisit[side], ( distance + weights[slot], u ) )
+
+    if meeting < 0: return inf, []
+
+    chain = [ meeting ]
+    while parents[0][ chain[-1] ] >= 0: chain.append( parents[0][ chain[-1] ] )
+    chain.reverse()
+    while parents[1][ chain[-1] ] >= 0: chain.append( parents[1][ chain[-1] ] )
+
+    hops = []
+    for a, b in zip( chain, chain[1:] ): self._unpack( a, b, hops )
+    distance = 0
+    for _, weight in hops: distance += weight
+    return distance, [ source ] + [ v for v, _ in hops ]
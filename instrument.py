@@ -0,0 +1,156 @@
+from __future__ import annotations
+from collections import deque
+from time import perf_counter
+import threading
+import functools
+import json
+import math
+import os
+
+#Instrumentación opcional de las operaciones del grafo: cantidad de llamadas, histogramas de
+#latencia y contadores (vértices definitivos, inserciones en el montículo). Al activarse
+#reemplaza los métodos medidos por envoltorios y al desactivarse restaura los originales, así que
+#desactivada no agrega ningún costo a las llamadas.
+
+#Métodos de 'Graph' que se miden.
+OPERATIONS = ( 'getVertex', 'distance', 'dijkstra', 'getPath', 'route', 'astar', 'farthest', 'prim', 'summary', 'connectedComponents', 'findMinimumSpanningTrees' )
+
+#Variable de entorno que activa la medición desde el inicio del programa (cualquier valor salvo '' o '0').
+ENVIRONMENT = 'AEROPUERTOS_PROFILE'
+
+profiler: Profiler | None = None #Perfilador activo; las búsquedas le informan sus contadores si existe.
+
+class Stat:
+  #Estadísticas de una operación. El histograma agrupa las latencias en potencias de 2 de microsegundos.
+  __slots__ = ( 'calls', 'total', 'min', 'max', 'histogram', 'counters' )
+
+  def __init__( self ):
+    self.calls = 0
+    self.total = 0.0 #Segundos acumulados.
+    self.min = math.inf
+    self.max = 0.0
+    self.histogram: dict[int, int] = {} #Exponente -> llamadas con latencia en [2^e, 2^(e+1)) µs.
+    self.counters: dict[str, int] = {}
+
+  def add( self, seconds ):
+    self.calls += 1
+    self.total += seconds
+    self.min = min( self.min, seconds )
+    self.max = max( self.max, seconds )
+    bucket = max( 0, int( seconds * 1e6 ).bit_length() - 1 )
+    self.histogram[bucket] = self.histogram.get( bucket, 0 ) + 1
+
+  #Latencia aproximada (límite superior del intervalo del histograma) del percentil 'q' (0-1).
+  def percentile( self, q ) -> float:
+    remaining = q * self.calls
+    for bucket in sorted( self.histogram ):
+      remaining -= self.histogram[bucket]
+      if remaining <= 0: return min( 2**( bucket + 1 ) / 1e6, self.max )
+    return self.max
+
+  def toDict( self ) -> dict:
+    return {
+      'calls': self.calls,
+      'total': self.total,
+      'mean': self.total / self.calls if self.calls else 0.0,
+      'min': self.min if self.calls else 0.0,
+      'max': self.max,
+      'p50': self.percentile( 0.5 ),
+      'p95': self.percentile( 0.95 ),
+      'histogram': { f'{2**b}us': n for b, n in sorted( self.histogram.items() ) },
+      'counters': dict( self.counters ),
+    }
+
+
+class Profiler:
+  #Registra las operaciones medidas y los eventos recientes para la traza de Chrome.
+  def __init__( self, events: int = 100_000 ):
+    self.stats: dict[str, Stat] = {}
+    self.events: deque = deque( maxlen=events ) #( nombre, inicio, duración, hilo ) más recientes.
+    self.origin = perf_counter()
+    self.lock = threading.Lock()
+    self._originals: list[tuple[object, str, object]] = [] #( dueño, atributo, original ) reemplazados.
+
+  @property
+  def enabled( self ) -> bool: return bool( self._originals )
+
+  #Envuelve los métodos de 'Graph' y las cargas del grafo ('dataset' y la instantánea). Para medir
+  #la carga inicial hay que activarlo antes de cargar el grafo (ver 'startup').
+  def enable( self ):
+    global profiler
+    if self.enabled: return
+    from compact import CompactGraph
+    from graph import Graph
+    import dataset
+    targets = [ ( Graph, name, name ) for name in OPERATIONS ] + [ ( Graph, 'load', 'load' ), ( CompactGraph, 'load', 'CompactGraph.load' ) ]
+    targets += [ ( dataset, name, f'dataset.{name}' ) for name in ( 'load', 'parse' ) ]
+
+    for owner, attribute, name in targets:
+      original = owner.__dict__[attribute]
+      wrapped = self._wrap( original.__func__ if isinstance( original, classmethod ) else original, name )
+      setattr( owner, attribute, classmethod( wrapped ) if isinstance( original, classmethod ) else wrapped )
+      self._originals.append( ( owner, attribute, original ) )
+    profiler = self
+
+  #Restaura los métodos originales.
+  def disable( self ):
+    global profiler
+    for owner, attribute, original in reversed( self._originals ): setattr( owner, attribute, original )
+    self._originals.clear()
+    if profiler is self: profiler = None
+
+  def _wrap( self, function, name ):
+    @functools.wraps( function )
+    def measured( *args, **kwargs ):
+      start = perf_counter()
+      try:
+        return function( *args, **kwargs )
+      finally:
+        self.record( name, start, perf_counter() - start )
+    return measured
+
+  #Registra una llamada de 'name' que empezó en 'start' y duró 'seconds'.
+  def record( self, name, start, seconds ):
+    with self.lock:
+      self.stats.setdefault( name, Stat() ).add( seconds )
+      self.events.append( ( name, start, seconds, threading.get_ident() ) )
+
+  #Suma contadores (por ejemplo 'settled' o 'pushes') a la operación 'name'.
+  def count( self, name, **counters ):
+    with self.lock:
+      stat = self.stats.setdefault( name, Stat() )
+      for counter, value in counters.items(): stat.counters[counter] = stat.counters.get( counter, 0 ) + value
+
+  #Descarta lo registrado.
+  def reset( self ):
+    with self.lock:
+      self.stats.clear()
+      self.events.clear()
+
+  #Estadísticas de todas las operaciones.
+  def snapshot( self ) -> dict[str, dict]:
+    with self.lock:
+      return { name: stat.toDict() for name, stat in sorted( self.stats.items() ) }
+
+  #Guarda las estadísticas en un archivo JSON.
+  def toJSON( self, path ):
+    with open( path, 'w', encoding='utf-8' ) as file: json.dump( self.snapshot(), file, indent=2 )
+
+  #Guarda los eventos recientes en el formato de trazas de Chrome (chrome://tracing o Perfetto).
+  def toChromeTrace( self, path ):
+    with self.lock: events = list( self.events )
+    trace = [
+      { 'name': name, 'ph': 'X', 'ts': ( start - self.origin ) * 1e6, 'dur': seconds * 1e6, 'pid': os.getpid(), 'tid': thread }
+      for name, start, seconds, thread in events
+    ]
+    with open( path, 'w', encoding='utf-8' ) as file: json.dump( { 'traceEvents': trace, 'displayTimeUnit': 'ms' }, file )
+
+
+#Activa la medición al iniciar el programa, antes de cargar el grafo, si lo pide 'enabled' (por
+#ejemplo, una opción de la línea de comandos) o la variable de entorno. Devuelve el perfilador
+#activo, o None si la medición no se pidió.
+def startup( enabled = False ) -> Profiler | None:
+  if not enabled and os.environ.get( ENVIRONMENT, '' ) in ( '', '0' ): return None
+  active = profiler or Profiler()
+  active.enable()
+  return active
@@ -1,6 +1,14 @@
+import sys
+
+#Con argumentos se ejecuta el modo por lotes, sin interfaz gráfica (ver 'batch.py').
+if __name__ == '__main__' and len(sys.argv) > 1:
+  from batch import main
+  sys.exit(main(sys.argv[1:]))
+
 import customtkinter as ctk
-from dataset import globe
+from executor import QueryExecutor
 from menu import Menu
+import instrument
 
 class App(ctk.CTk):
   def __init__(self):
@@ -14,11 +22,30 @@ class App(ctk.CTk):
     self.rowconfigure(0, weight=1)
     self.columnconfigure(0, weight=4, uniform='a')
 
-    self.graph = globe
+    #queries
+    self.progress = ctk.CTkProgressBar(self, mode='indeterminate')
+    self.progress.grid(row=1, column=0, sticky='ew', padx=8, pady=4)
+    self.progress.grid_remove()
+    self.executor = QueryExecutor(self, self.progress)
 
-    self.menu = Menu(self, self.graph, self)
+    # La ventana aparece de inmediato; el grafo se carga en el hilo de trabajo. Con la variable de
+    # entorno AEROPUERTOS_PROFILE la medición empieza antes, para incluir la carga del grafo.
+    instrument.startup()
+    self.graph = None
+    self.loading = ctk.CTkLabel(self, text='Cargando el grafo de aeropuertos...', font=ctk.CTkFont(family="Roboto", size=14))
+    self.loading.grid(row=0, column=0)
+    self.executor.submit('load', self.loadGraph, self.showGraph)
 
     self.mainloop()
 
-App() 
+  # Se ejecuta en el hilo de trabajo; el avance de la lectura del CSV se muestra en la barra.
+  def loadGraph(self, query):
+    import dataset
+    return dataset.load(lambda rows, rate, fraction: query.report(fraction) if fraction is not None else None)
 
+  def showGraph(self, graph):
+    self.loading.destroy()
+    self.graph = graph
+    self.menu = Menu(self, self.graph, self, self.executor)
+
+App() 
@@ -1,14 +1,14 @@
-import folium as fm
-from numpy import infty
 import webbrowser
 from panels import *
+import instrument
+import render
 import customtkinter as ctk
 from tkinter import messagebox
 
 
 class Menu(ctk.CTkTabview):
-  def __init__(self, parent, graph, app):
-    super().__init__(parent)
+  def __init__(self, parent, graph, app, executor):
+    super().__init__(parent, command=self.openTab)
     self.grid(row=0, column=0, sticky='nsew')
 
     #tabs
@@ -16,21 +16,37 @@ class Menu(ctk.CTkTabview):
     self.add('Información de un Aeropuerto')
     self.add('Caminos Mínimos Más Largos')
     self.add('Camino Mínimo')
+    self.add('Rendimiento')
 
-    #frames
-    GraphPanel(self.tab('Grafo de Aeropuertos'), graph, app)
-    InfoFrame(self.tab('Información de un Aeropuerto'),graph, app)
-    self.longestPathFrame = LongestPathFrame(self.tab('Caminos Mínimos Más Largos'), graph, app)
-    MinPathFrame(self.tab('Camino Mínimo'), graph, app) 
+    #queries
+    self.executor = executor
+
+    #frames: cada pestaña se construye (y calcula su contenido) la primera vez que se abre.
+    self.frames = {
+      'Grafo de Aeropuertos': lambda tab: GraphPanel(tab, graph, app, self.executor),
+      'Información de un Aeropuerto': lambda tab: InfoFrame(tab, graph, app, self.executor),
+      'Caminos Mínimos Más Largos': lambda tab: LongestPathFrame(tab, graph, app, self.executor),
+      'Camino Mínimo': lambda tab: MinPathFrame(tab, graph, app, self.executor),
+      'Rendimiento': lambda tab: PerformanceFrame(tab, graph, app),
+    }
+    self.openTab()
+
+  def openTab(self):
+    build = self.frames.pop(self.get(), None)
+    if build: build(self.tab(self.get()))
 
   
 class GraphPanel(ctk.CTkFrame):
-  def __init__(self, parent, graph, app):
+  def __init__(self, parent, graph, app, executor):
       super().__init__(parent, fg_color='transparent')
       self.pack(expand=True, fill='both')
 
-      
-      self.graphInfo(graph)
+      # El mapa de la red se genera en el hilo de trabajo la primera vez y luego se reutiliza.
+      ctk.CTkButton(self, text='Ver Mapa de la Red', font=font(14), corner_radius=5,
+                    command=lambda: executor.submit('network', lambda query: render.networkMap(graph), webbrowser.open_new_tab)).pack(anchor='e', padx=4, pady=4)
+
+      # El resumen se calcula en el hilo de trabajo y se muestra al terminar.
+      executor.submit('graph', lambda query: self.graphInfo(graph), self.showGraphInfo)
 
   def graphInfo(self, graph):
 
@@ -38,36 +54,78 @@ class GraphPanel(ctk.CTkFrame):
       isConnected = graph.isConnected()
       connectedComponents = graph.connectedComponents()
       weight = graph.findMinimumSpanningTrees()
+      return isConnected, connectedComponents, weight
 
+  def showGraphInfo(self, info):
       # Crear un nuevo panel o mostrar información
-      GraphInfoPanel(self, isConnected, connectedComponents, weight)
+      GraphInfoPanel(self, *info)
 
    
 class InfoFrame(ctk.CTkFrame):
-  def __init__(self, parent, graph, app):
+  def __init__(self, parent, graph, app, executor):
     super().__init__(parent, fg_color='transparent')
     self.pack(expand=True, fill='both')
+    self.executor = executor
 
     def searchCommand(entry):
       return lambda: self.searchAirport(entry, graph) 
     
     self.infoPanel = None
-    SimplePanel(self, 'Ingrese el código del aeropuerto a buscar: ', 'Buscar Aeropuerto', searchCommand)
+    SimplePanel(self, 'Ingrese el código, nombre, ciudad o país del aeropuerto a buscar, o una ubicación (latitud, longitud): ', 'Buscar Aeropuerto', searchCommand)
   
+  # Las búsquedas usan los índices del grafo, así que se hacen en el hilo de trabajo como las demás consultas.
   def searchAirport(self, entry, graph):
     code = entry.get().upper()
-    if self.infoPanel: self.infoPanel.destroy()
+    location = self.parseLocation(code)
+    if location:
+      # Una ubicación "latitud, longitud" muestra los aeropuertos más cercanos.
+      self.executor.submit('info', lambda query: graph.nearest(*location, k=5), lambda airports: self.showNearby(location, airports))
+    else:
+      self.executor.submit('info', lambda query: self.findAirports(graph, code), lambda matches: self.showMatches(entry, matches))
+
+  # El aeropuerto con ese código o, si no es un código, los que coinciden por prefijo de nombre, ciudad o país.
+  def findAirports(self, graph, code):
     vertex = graph.getVertex(code)
-    if vertex:
-      self.infoPanel = InfoPanel(self, vertex.data['Name'], vertex.data['City'], vertex.data['Country'], vertex.data['Latitude'], vertex.data['Longitude']  )
+    if vertex: return [vertex]
+    if not code: return []
+    return list(dict.fromkeys(v for field in ('Name', 'City', 'Country') for v in graph.searchVertices(field, code)))
+
+  def showNearby(self, location, airports):
+    if self.infoPanel: self.infoPanel.destroy()
+    self.infoPanel = NearbyPanel(self, *location, airports)
+
+  # Una sola coincidencia se muestra directamente; si hay varias, se listan para elegir una.
+  def showMatches(self, entry, matches):
+    if self.infoPanel: self.infoPanel.destroy()
+    self.infoPanel = None
+    if len(matches) == 1:
+      self.showAirport(matches[0])
+    elif matches:
+      self.infoPanel = MatchesPanel(self, matches, self.showAirport)
     else:
       messagebox.showerror('Error', 'El aeropuerto no existe en la base de datos.')
       entry.delete(0, 'end')
 
+  def showAirport(self, vertex):
+    if self.infoPanel: self.infoPanel.destroy()
+    self.infoPanel = InfoPanel(self, vertex.data['Name'], vertex.data['City'], vertex.data['Country'], vertex.data['Latitude'], vertex.data['Longitude']  )
+
+  # Devuelve (latitud, longitud) si el texto es una ubicación válida, o None.
+  def parseLocation(self, text):
+    parts = text.split(',')
+    if len(parts) != 2: return None
+    try:
+      latitude, longitude = float(parts[0]), float(parts[1])
+    except ValueError:
+      return None
+    if -90 <= latitude <= 90 and -180 <= longitude <= 180: return latitude, longitude
+    return None
+
 class LongestPathFrame(ctk.CTkFrame):
-  def __init__(self, parent, graph, app):
+  def __init__(self, parent, graph, app, executor):
     super().__init__(parent, fg_color='transparent')
     self.pack(expand=True, fill='both')
+    self.executor = executor
 
      # Layout
     self.rowconfigure(0, weight=1)
@@ -81,34 +139,43 @@ class LongestPathFrame(ctk.CTkFrame):
     def searchCommand(entry):
       return lambda: self.searchLongestPath(entry, graph) 
     
-    self.infoPanel = None
+    self.panelK = SimplePanel(self.scroll_frame, 'Cantidad de aeropuertos por página: ', None, None)
+    self.panelK.winfo_children()[1].insert(0, '10')
     SimplePanel(self.scroll_frame, 'Ingrese el código del aeropuerto de origen: ', 'Ver Rutas', searchCommand)
 
+    # Lista virtual: un grupo fijo de filas que se reutilizan al desplazarse.
+    self.results = VirtualList(self.scroll_frame, 4, self.renderPath, self.loadMore)
+    self.search = None
+
   def searchLongestPath(self, entry, graph):
     code = entry.get().upper()
     vertex = graph.getVertex(code)
-    if self.infoPanel: self.infoPanel.destroy()
-    minPaths = graph.dijkstra(vertex)
-    minPaths = {
-      key: minPaths[key]
-      for key in sorted( minPaths, key=lambda x: minPaths[x][0], reverse = True)
-      if not minPaths[key][0] == infty
-    }
-  
-    i = 0
-    for airport in minPaths:
-      pathAux = graph.getPath(minPaths, vertex, airport)
-      path = pathAux[pathAux.index('(') + 1:pathAux.index(')')].split('->')
-      LongestPathPanel(self.scroll_frame, graph.getPath(minPaths, vertex, airport), float(path[0]))
-      InfoPanel(self.scroll_frame, airport.data['Name'], airport.data['City'], airport.data['Country'], airport.data['Latitude'], airport.data['Longitude'])
-      i += 1
-      if i>=10:
-        break
+    k = self.panelK.winfo_children()[1].get()
+    if not vertex or not k.isdigit() or int(k) < 1:
+      messagebox.showerror('Error', 'El aeropuerto no existe en la base de datos o la cantidad no es válida.')
+      entry.delete(0, 'end')
+      return
+
+    # Una búsqueda nueva cancela la anterior si sigue en curso.
+    self.search = (graph, vertex, int(k))
+    self.results.reset([])
+    self.executor.submit('longest', lambda query: graph.farthest(vertex, int(k), query.cancelled), self.results.reset)
+
+  # Pide la página siguiente (el árbol de caminos ya está en la caché del grafo).
+  def loadMore(self):
+    graph, vertex, k = self.search
+    loaded = len(self.results.items)
+    self.executor.submit('longest', lambda query: graph.farthest(vertex, loaded + k, query.cancelled)[loaded:], self.results.extend)
+
+  def renderPath(self, path):
+    airport = path.vertices[-1].data
+    return str(path), round(path.distance, 3), airport['Name'], airport['City'], airport['Country'], airport['Latitude'], airport['Longitude']
 
 class MinPathFrame(ctk.CTkFrame):
-  def __init__(self, parent, graph, app):
+  def __init__(self, parent, graph, app, executor):
     super().__init__(parent, fg_color='transparent')
     self.pack(expand=True, fill='both')
+    self.executor = executor
 
     def minPathCommand(entry):
       return lambda: self.minPath(entry, graph)
@@ -117,24 +184,9 @@ class MinPathFrame(ctk.CTkFrame):
     self.panel1 = SimplePanel(self, 'Ingrese el código del aeropuerto de origen: ', None, None)
     SimplePanel(self, 'Ingrese el código del aeropuerto de destino: ', 'Ver Camino Mínimo', minPathCommand)
   
-  def generateMap(self, graph, airportCodes, code):
-    airports = graph.data
-    map = fm.Map(location=[20, 0], zoom_start=2)
-    startLocation = None
-    for code in airportCodes:
-      for airport in airports:
-        if airport['Code'] == code:
-          location = [airport['Latitude'], airport['Longitude']]
-          if not startLocation:
-            startLocation = location
-          fm.Marker(location, popup=airport['Name']).add_to(map)
-          actualLocation = location
-          if startLocation and actualLocation:
-            fm.PolyLine([startLocation, actualLocation], color='blue').add_to(map)
-            startLocation = actualLocation
-
-    map.save('map.html')
-    webbrowser.open_new_tab('map.html')
+  # Mapa con solo el camino de la consulta (recorre únicamente sus vértices).
+  def generateMap(self, path):
+    render.pathMap(path, 'map.html')
 
   def minPath(self, entry, graph):
     codeDestination = entry.get().upper()
@@ -151,19 +203,88 @@ class MinPathFrame(ctk.CTkFrame):
       return
     if self.infoPanel: self.infoPanel.destroy()
     self.infoPanel = InfoPanel(self, destination.data['Name'], destination.data['City'], destination.data['Country'], destination.data['Latitude'], destination.data['Longitude']  )
-    minPaths = graph.dijkstra(source)
-    minPaths = {
-      key: minPaths[key]
-      for key in sorted( minPaths, key=lambda x: minPaths[x][0], reverse = True)
-      if not minPaths[key][0] == infty
-    }
-    pathAux = graph.getPath(minPaths, source, destination)
-    path = pathAux[pathAux.index('(') + 1:pathAux.index(')')].split('->')
-    LongestPathPanel(self,  graph.getPath(minPaths, source, destination), float(path[0]))
-    minPath = graph.getPath(minPaths, source, destination)
-    airportCodes = []
-    if '(' in minPath:
-      minPath = minPath[minPath.index('): ') + 3:]
-      airportCodes = minPath.split(' -> ')
-    self.generateMap(graph, airportCodes, codeSource)
-    
\ No newline at end of file
+
+    # La ruta y el mapa se calculan en el hilo de trabajo; una consulta nueva cancela la anterior.
+    def query(query):
+      path = graph.route(source, destination, query.cancelled)
+      if path:
+        self.generateMap(path)
+      return path
+    self.executor.submit('minPath', query, self.showMinPath)
+
+  def showMinPath(self, path):
+    LongestPathPanel(self, str(path), round(path.distance, 3))
+    if path:
+      webbrowser.open_new_tab('map.html')
+
+
+class PerformanceFrame(ctk.CTkFrame):
+  def __init__(self, parent, graph, app, interval=1000):
+    super().__init__(parent, fg_color='transparent')
+    self.pack(expand=True, fill='both')
+    self.profiler = instrument.profiler or instrument.Profiler() # El activado al iniciar, si lo hay.
+    self.interval = interval # Milisegundos entre actualizaciones de la tabla.
+    self.pending = None # Actualización programada con 'after', para no acumular varias.
+
+    #layout
+    self.rowconfigure(1, weight=1)
+    self.columnconfigure(0, weight=1)
+
+    controls = ctk.CTkFrame(self, fg_color='transparent')
+    controls.grid(row=0, column=0, sticky='ew', padx=4, pady=4)
+    self.switch = ctk.CTkSwitch(controls, text='Medir operaciones', font=font(14), command=self.toggle)
+    self.switch.pack(side='left', padx=4)
+    ctk.CTkButton(controls, text='Reiniciar', font=font(14), width=80, corner_radius=5, command=self.reset).pack(side='right', padx=4)
+    ctk.CTkButton(controls, text='Traza', font=font(14), width=80, corner_radius=5, command=self.exportTrace).pack(side='right', padx=4)
+    ctk.CTkButton(controls, text='JSON', font=font(14), width=80, corner_radius=5, command=self.exportJSON).pack(side='right', padx=4)
+
+    self.table = ctk.CTkTextbox(self, font=ctk.CTkFont(family='Courier', size=12), wrap='none')
+    self.table.grid(row=1, column=0, sticky='nsew', padx=4, pady=4)
+    if self.profiler.enabled:
+      self.switch.select()
+      self.refresh()
+    else:
+      self.show()
+
+  # Activa o desactiva la instrumentación; activa, la tabla se actualiza periódicamente.
+  def toggle(self):
+    if self.pending: self.after_cancel(self.pending)
+    self.pending = None
+    if self.switch.get():
+      self.profiler.enable()
+      self.pending = self.after(self.interval, self.refresh)
+    else:
+      self.profiler.disable()
+      self.show()
+
+  def refresh(self):
+    self.pending = None
+    self.show()
+    if self.profiler.enabled: self.pending = self.after(self.interval, self.refresh)
+
+  # Muestra una fila por operación: llamadas, latencias en milisegundos y contadores.
+  def show(self):
+    lines = [f"{'Operación':<26}{'Llamadas':>9}{'Media':>10}{'p50':>10}{'p95':>10}{'Máx.':>10}  Contadores"]
+    for name, stat in self.profiler.snapshot().items():
+      counters = ', '.join(f'{counter}={value}' for counter, value in stat['counters'].items())
+      lines.append(f"{name:<26}{stat['calls']:>9}{stat['mean'] * 1000:>10.3f}{stat['p50'] * 1000:>10.3f}{stat['p95'] * 1000:>10.3f}{stat['max'] * 1000:>10.3f}  {counters}")
+    if len(lines) == 1: lines.append('Active la medición y use las demás pestañas para ver los costos.')
+    self.table.configure(state='normal')
+    self.table.delete('1.0', 'end')
+    self.table.insert('1.0', '\n'.join(lines))
+    self.table.configure(state='disabled')
+
+  def reset(self):
+    self.profiler.reset()
+    self.show()
+
+  def exportJSON(self):
+    from tkinter import filedialog
+    path = filedialog.asksaveasfilename(defaultextension='.json', filetypes=[('JSON', '*.json')])
+    if path: self.profiler.toJSON(path)
+
+  # Traza para chrome://tracing o Perfetto.
+  def exportTrace(self):
+    from tkinter import filedialog
+    path = filedialog.asksaveasfilename(defaultextension='.json', filetypes=[('Chrome trace', '*.json')])
+    if path: self.profiler.toChromeTrace(path)
@@ -1,5 +1,13 @@
 import customtkinter as ctk
 
+fonts = {}
+
+# Fuentes compartidas: se crean una sola vez por tamaño y peso.
+def font(size, weight='normal'):
+  if (size, weight) not in fonts:
+    fonts[(size, weight)] = ctk.CTkFont(family="Roboto", size=size, weight=weight)
+  return fonts[(size, weight)]
+
 class Panel(ctk.CTkFrame):
   def __init__(self, parent):
     super().__init__(parent, fg_color='#EEEEEE')
@@ -67,6 +75,34 @@ class InfoPanel(Panel):
     ctk.CTkLabel(self, text="Longitud:", font=ctk.CTkFont(family="Roboto", size=14, weight="bold")).grid(row=4, column=0, padx=4, sticky='w')
     ctk.CTkLabel(self, text=longitude, font=ctk.CTkFont(family="Roboto", size=14)).grid(row=4, column=1, padx=4, sticky='w')
 
+class NearbyPanel(Panel):
+  def __init__(self, parent, latitude, longitude, airports):
+    super().__init__(parent)
+
+    #layout
+    self.columnconfigure(1, weight=1)
+
+    ctk.CTkLabel(self, text=f"Aeropuertos cercanos a ({latitude}, {longitude}):", font=font(14, 'bold')).grid(row=0, column=0, columnspan=2, padx=4, sticky='w')
+    for i, (vertex, km) in enumerate(airports):
+      ctk.CTkLabel(self, text=f"{round(km, 3)} km", font=font(14, 'bold')).grid(row=i + 1, column=0, padx=4, sticky='w')
+      ctk.CTkLabel(self, text=f"{vertex.data['Code']} - {vertex.data['Name']} ({vertex.data['City']}, {vertex.data['Country']})", font=font(14)).grid(row=i + 1, column=1, padx=4, sticky='w')
+
+class MatchesPanel(Panel):
+  LIMIT = 20 # Coincidencias que se listan; del resto solo se muestra la cantidad.
+
+  def __init__(self, parent, matches, select):
+    super().__init__(parent)
+
+    #layout
+    self.columnconfigure(0, weight=1)
+
+    ctk.CTkLabel(self, text=f"{len(matches)} aeropuertos coinciden con la búsqueda; elija uno:", font=font(14, 'bold')).grid(row=0, column=0, padx=4, sticky='w')
+    for i, vertex in enumerate(matches[:self.LIMIT]):
+      ctk.CTkButton(self, text=f"{vertex.data['Code']} - {vertex.data['Name']} ({vertex.data['City']}, {vertex.data['Country']})", font=font(14), anchor='w', corner_radius=5,
+                    fg_color='transparent', text_color=('gray10', 'gray90'), command=lambda vertex=vertex: select(vertex)).grid(row=i + 1, column=0, padx=4, sticky='ew')
+    if len(matches) > self.LIMIT:
+      ctk.CTkLabel(self, text=f"Y {len(matches) - self.LIMIT} más: escriba más letras o el código para acotar la búsqueda.", font=font(12)).grid(row=self.LIMIT + 1, column=0, padx=4, sticky='w')
+
 class LongestPathPanel(Panel):
   def __init__(self, parent, minPaths, distance):
     super().__init__(parent)
@@ -78,4 +114,102 @@ class LongestPathPanel(Panel):
     ctk.CTkLabel(self, text="Camino:", font=ctk.CTkFont(family="Roboto", size=14, weight="bold")).grid(row=0, column=0, padx=4, sticky='w')
     ctk.CTkLabel(self, text=minPaths, font=ctk.CTkFont(family="Roboto", size=14)).grid(row=0, column=1, padx=4, sticky='w')
     ctk.CTkLabel(self, text="Distancia:", font=ctk.CTkFont(family="Roboto", size=14, weight="bold")).grid(row=1, column=0, padx=4, sticky='w')
-    ctk.CTkLabel(self, text=distance, font=ctk.CTkFont(family="Roboto", size=14)).grid(row=1, column=1, padx=4, sticky='w')
\ No newline at end of file
+    ctk.CTkLabel(self, text=distance, font=ctk.CTkFont(family="Roboto", size=14)).grid(row=1, column=1, padx=4, sticky='w')
+
+class ResultRow(Panel):
+  FIELDS = ('Camino:', 'Distancia:', 'Nombre:', 'Ciudad:', 'País:', 'Latitud:', 'Longitud:')
+
+  def __init__(self, parent):
+    super().__init__(parent)
+
+    #layout
+    self.columnconfigure(1, weight=1)
+
+    self.values = []
+    for i, field in enumerate(self.FIELDS):
+      ctk.CTkLabel(self, text=field, font=font(14, 'bold')).grid(row=i, column=0, padx=4, sticky='w')
+      label = ctk.CTkLabel(self, text='', font=font(14), justify='left')
+      label.grid(row=i, column=1, padx=4, sticky='w')
+      self.values.append(label)
+
+  # Reutiliza la fila mostrando otros valores.
+  def show(self, values):
+    for label, value in zip(self.values, values):
+      label.configure(text=value)
+
+
+class VirtualList(ctk.CTkFrame):
+  def __init__(self, parent, rows, render, loadMore=None):
+    super().__init__(parent, fg_color='transparent')
+    self.pack(fill='both', expand=True)
+
+    self.render = render # Convierte un elemento en los textos de una fila.
+    self.loadMore = loadMore # Pide más elementos; deben llegar con 'extend'.
+    self.items = []
+    self.offset = 0 # Índice del elemento mostrado en la primera fila.
+    self.loading = False
+    self.exhausted = True
+
+    #layout
+    self.rowconfigure(0, weight=1)
+    self.columnconfigure(0, weight=1)
+
+    self.body = ctk.CTkFrame(self, fg_color='transparent')
+    self.body.grid(row=0, column=0, sticky='nsew')
+    self.scrollbar = ctk.CTkScrollbar(self, command=self.scroll)
+    self.scrollbar.grid(row=0, column=1, sticky='ns')
+
+    # Grupo fijo de filas que se reutilizan.
+    self.pool = [ResultRow(self.body) for _ in range(rows)]
+    for widget in [self.body] + self.pool + [label for row in self.pool for label in row.winfo_children()]:
+      for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+        widget.bind(sequence, self.wheel, add='+')
+    self.refresh()
+
+  # Reemplaza los elementos (una búsqueda nueva).
+  def reset(self, items):
+    self.items = list(items)
+    self.offset = 0
+    self.loading = False
+    self.exhausted = not self.items
+    self.refresh()
+
+  # Agrega la página que llegó; una página vacía indica que no hay más.
+  def extend(self, items):
+    self.items.extend(items)
+    self.loading = False
+    self.exhausted = not items
+    self.refresh()
+
+  # Protocolo de las barras de desplazamiento de Tk: ('moveto', fracción) o ('scroll', n, 'units'|'pages').
+  def scroll(self, action, amount, unit='units'):
+    if action == 'moveto':
+      self.offset = int(float(amount) * len(self.items))
+    else:
+      self.offset += int(amount) * (len(self.pool) if unit == 'pages' else 1)
+    self.offset = max(0, min(self.offset, len(self.items) - len(self.pool)))
+    self.refresh()
+
+  def wheel(self, event):
+    self.scroll('scroll', -1 if event.num == 4 or event.delta > 0 else 1)
+    return 'break'
+
+  # Vuelve a asignar los elementos visibles a las filas del grupo.
+  def refresh(self):
+    for i, row in enumerate(self.pool):
+      if self.offset + i < len(self.items):
+        row.show(self.render(self.items[self.offset + i]))
+        if not row.winfo_manager(): row.pack(fill='x', pady=4, ipady=8)
+      elif row.winfo_manager():
+        row.pack_forget()
+
+    if self.items:
+      self.scrollbar.set(self.offset / len(self.items), min(1, (self.offset + len(self.pool)) / len(self.items)))
+    else:
+      self.scrollbar.set(0, 1)
+
+    # Cuando se llega al final, pide la página siguiente.
+    if self.loadMore and self.items and not self.loading and not self.exhausted and self.offset + len(self.pool) >= len(self.items):
+      self.loading = True
+      self.loadMore()
+
@@ -0,0 +1,69 @@
+from __future__ import annotations
+from math import inf
+
+class Path:
+  #Resultado de una consulta de camino mínimo: secuencia de vértices, peso de cada tramo y
+  #distancia total. El formato de texto solo se aplica al mostrarlo.
+  __slots__ = ( 'vertices', 'weights', 'distance', 'endpoints' )
+
+  def __init__( self, vertices: list, weights: list[float], distance: float, endpoints: tuple = None ):
+    self.vertices = vertices #Vértices desde el origen hasta el destino (vacío si no hay camino).
+    self.weights = weights #Peso de cada tramo ( len( vertices ) - 1 ).
+    self.distance = distance #Distancia total.
+    self.endpoints = endpoints or ( vertices[0], vertices[-1] ) #( origen, destino ), aunque no haya camino.
+
+  #Camino inexistente entre dos vértices.
+  @classmethod
+  def unreachable( cls, source, destination ):
+    return cls( [], [], inf, ( source, destination ) )
+
+  #Construye el camino con un único recorrido de predecesores sobre un árbol de caminos
+  #mínimos { vértice: ( distancia, predecesor ) }.
+  @classmethod
+  def fromTree( cls, minpaths, source, destination ):
+    if not destination in minpaths or minpaths[destination][0] == inf:
+      return cls.unreachable( source, destination )
+
+    vertices = [ destination ]
+    weights = []
+    while not same( vertices[-1], source ):
+      predecessor = minpaths[ vertices[-1] ][1]
+      weights.append( hop( predecessor, vertices[-1] ) )
+      vertices.append( predecessor )
+    return cls( vertices[::-1], weights[::-1], minpaths[destination][0] )
+
+  #Construye el camino a partir de la lista de vértices y la distancia total.
+  @classmethod
+  def fromVertices( cls, vertices, distance ):
+    return cls( vertices, [ hop( u, v ) for u, v in zip( vertices, vertices[1:] ) ], distance )
+
+  #El mismo camino recorrido en sentido contrario.
+  def reversed( self ) -> Path:
+    return Path( self.vertices[::-1], self.weights[::-1], self.distance, self.endpoints[::-1] )
+
+  @property
+  #Identificadores de los vértices del camino.
+  def codes( self ) -> list[str]: return [ str( v ) for v in self.vertices ]
+
+  #Un camino es verdadero si existe.
+  def __bool__( self ): return self.distance < inf
+
+  #Cantidad de tramos.
+  def __len__( self ): return len( self.weights )
+
+  def __iter__( self ): return iter( self.vertices )
+
+  def __str__( self ):
+    if not self: return f"{self.endpoints[0]} -/-> {self.endpoints[1]} "
+    return f"({round(self.distance,3)}): " + ' -> '.join( self.codes )
+
+  def __repr__( self ): return f"Path{ str( self ) }"
+
+#Compara dos vértices: los de 'Graph' por identidad (su igualdad compara todos los datos) y las
+#vistas de 'CompactGraph', que se crean en cada acceso, por su posición.
+def same( u, v ) -> bool:
+  return u is v or ( hasattr( u, 'graph' ) and u == v )
+
+#Peso de la arista más liviana de 'u' a 'v'.
+def hop( u, v ) -> float:
+  return min( e.weight for e in u.edges if same( e.vertices[1], v ) )
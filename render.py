@@ -0,0 +1,127 @@
+from __future__ import annotations
+import json
+import os
+
+#Capa de mapas sobre 'Graph.getRoutes': la red completa se convierte una sola vez en GeoJSON
+#(aeropuertos y rutas por nivel de detalle) y se reutiliza mientras el grafo no cambie. El mapa
+#de la red agrupa los aeropuertos en clústeres y muestra más rutas a medida que se acerca la
+#vista; el mapa de cada consulta solo dibuja su camino. 'folium' se importa al dibujar.
+
+#Niveles de detalle: ( rutas acumuladas, zoom mínimo ). Las rutas más importantes (entre los
+#aeropuertos con más conexiones) se ven siempre; el resto aparece al acercarse. El último nivel
+#(None) tiene todas las rutas restantes, así que con el zoom máximo se ve la red completa.
+LEVELS = ( ( 500, 0 ), ( 3000, 4 ), ( 20000, 6 ), ( None, 8 ) )
+
+#Estilo de las rutas de la red y del camino de una consulta.
+ROUTE_STYLE = { 'color': '#3388ff', 'weight': 1, 'opacity': 0.4 }
+PATH_STYLE = { 'color': 'blue', 'weight': 3 }
+
+#Marcador con ventana emergente para cada fila [ latitud, longitud, texto ] del clúster.
+MARKER = """function (row) {
+  var marker = L.marker(new L.LatLng(row[0], row[1]));
+  marker.bindPopup(row[2]);
+  return marker;
+}"""
+
+class NetworkLayer:
+  #Aeropuertos y rutas del grafo listos para dibujar.
+  def __init__( self, graph, levels = LEVELS ):
+    degree = { v.data[graph.identifier]: len( v.edges ) for v in graph.vertices }
+    self.airports = [ [ v.data['Latitude'], v.data['Longitude'], f"{v.data[graph.identifier]} - {v.data['Name']}" ] for v in graph.vertices ]
+
+    #Rutas de mayor a menor importancia: primero las que unen aeropuertos con muchas conexiones.
+    routes = sorted( graph.getRoutes(), key=lambda r: ( min( degree[ r['Codes'][0] ], degree[ r['Codes'][1] ] ), r['Weight'] ), reverse=True )
+    self.levels: list[tuple[dict, int]] = [] #( FeatureCollection, zoom mínimo ) por nivel.
+    start = 0
+    for stop, zoom in levels:
+      features = [ {
+        'type': 'Feature',
+        'geometry': { 'type': 'LineString', 'coordinates': [ [ r['Source'][1], r['Source'][0] ], [ r['Destination'][1], r['Destination'][0] ] ] },
+        'properties': { 'route': f"{r['Codes'][0]} - {r['Codes'][1]}", 'distance': round( r['Weight'], 3 ) },
+      } for r in routes[start:stop] ]
+      if features: self.levels.append( ( { 'type': 'FeatureCollection', 'features': features }, zoom ) )
+      if stop is None: break
+      start = stop
+    self.saved: str | None = None #Archivo con el mapa de la red, si ya se generó.
+
+  #GeoJSON de todos los aeropuertos.
+  def airportsGeoJSON( self ) -> dict:
+    return { 'type': 'FeatureCollection', 'features': [
+      { 'type': 'Feature', 'geometry': { 'type': 'Point', 'coordinates': [ lon, lat ] }, 'properties': { 'name': name } }
+      for lat, lon, name in self.airports
+    ] }
+
+  #Guarda la capa como GeoJSON (aeropuertos y rutas de todos los niveles) para otras herramientas.
+  def save( self, path ):
+    features = self.airportsGeoJSON()['features'] + [ f for collection, _ in self.levels for f in collection['features'] ]
+    with open( path, 'w', encoding='utf-8' ) as file: json.dump( { 'type': 'FeatureCollection', 'features': features }, file )
+
+#Capa de 'graph', construida la primera vez y guardada en el grafo hasta que cambie.
+def layer( graph ) -> NetworkLayer:
+  if graph.networkLayer is None: graph.networkLayer = NetworkLayer( graph )
+  return graph.networkLayer
+
+#Muestra u oculta cada grupo de rutas según el zoom del mapa.
+def zoomLevels( groups ):
+  from branca.element import MacroElement
+  from jinja2 import Template
+
+  class ZoomLevels( MacroElement ):
+    _template = Template( """
+      {% macro script(this, kwargs) %}
+      (function() {
+        var map = {{ this._parent.get_name() }};
+        var levels = [ {% for group, zoom in this.groups %}[ {{ group.get_name() }}, {{ zoom }} ], {% endfor %} ];
+        function update() {
+          var zoom = map.getZoom();
+          levels.forEach(function(level) {
+            if (zoom >= level[1]) { if (!map.hasLayer(level[0])) map.addLayer(level[0]); }
+            else if (map.hasLayer(level[0])) map.removeLayer(level[0]);
+          });
+        }
+        map.on('zoomend', update);
+        update();
+      })();
+      {% endmacro %}
+    """ )
+
+    def __init__( self, groups ):
+      super().__init__()
+      self._name = 'ZoomLevels'
+      self.groups = groups
+
+  return ZoomLevels( groups )
+
+#Mapa de la red completa en 'path'. Se genera una sola vez mientras el grafo no cambie.
+def networkMap( graph, path = 'network.html' ) -> str:
+  network = layer( graph )
+  if network.saved == path and os.path.exists( path ): return path
+
+  import folium as fm
+  from folium.plugins import FastMarkerCluster
+  map = fm.Map( location=[20, 0], zoom_start=2, prefer_canvas=True )
+  FastMarkerCluster( network.airports, callback=MARKER, name='Aeropuertos' ).add_to( map )
+
+  groups = []
+  for collection, zoom in network.levels:
+    group = fm.FeatureGroup( name=f'Rutas (zoom {zoom}+)' ).add_to( map )
+    fm.GeoJson( collection, style_function=lambda feature: ROUTE_STYLE, tooltip=fm.GeoJsonTooltip( fields=[ 'route', 'distance' ] ) ).add_to( group )
+    groups.append( ( group, zoom ) )
+  zoomLevels( groups ).add_to( map )
+
+  map.save( path )
+  network.saved = path
+  return path
+
+#Mapa de un camino mínimo ('Path') en 'path': solo los aeropuertos y tramos del camino.
+def pathMap( route, path = 'map.html' ) -> str:
+  import folium as fm
+  locations = [ [ v.data['Latitude'], v.data['Longitude'] ] for v in route.vertices ]
+  map = fm.Map( location=locations[0] if locations else [20, 0], zoom_start=2 )
+  for vertex, location in zip( route.vertices, locations ):
+    fm.Marker( location, popup=vertex.data['Name'] ).add_to( map )
+  if len( locations ) > 1:
+    fm.PolyLine( locations, **PATH_STYLE ).add_to( map )
+    map.fit_bounds( [ [ min( lat for lat, _ in locations ), min( lon for _, lon in locations ) ], [ max( lat for lat, _ in locations ), max( lon for _, lon in locations ) ] ] )
+  map.save( path )
+  return path
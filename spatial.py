@@ -0,0 +1,107 @@
+from __future__ import annotations
+import numpy as np
+import heapq
+
+EARTH_RADIUS = 6371 #Radio medio de la Tierra en kilómetros.
+
+#Convierte latitudes y longitudes en grados a vectores unitarios ( x, y, z ).
+def unitVectors( latitudes, longitudes ) -> np.ndarray:
+  lt, ln = np.radians( np.asarray( latitudes, dtype=float ) ), np.radians( np.asarray( longitudes, dtype=float ) )
+  return np.stack( ( np.cos( lt ) * np.cos( ln ), np.cos( lt ) * np.sin( ln ), np.sin( lt ) ), axis=-1 )
+
+#Distancias en kilómetros sobre la esfera a partir de las cuerdas entre vectores unitarios.
+def arcs( chords ):
+  return 2 * EARTH_RADIUS * np.arcsin( np.clip( chords / 2, 0, 1 ) )
+
+class SpatialIndex:
+  #Árbol k-d sobre las posiciones de los aeropuertos como vectores unitarios en 3D. La distancia
+  #en línea recta (cuerda) crece con la distancia sobre la esfera, así que el vecino más cercano
+  #en 3D es también el más cercano en la superficie, sin casos especiales en los polos ni en el
+  #antimeridiano. Cada nodo guarda su caja envolvente para descartar ramas enteras.
+
+  def __init__( self, latitudes, longitudes, leafSize: int = 16 ):
+    self.points = unitVectors( latitudes, longitudes )
+    self.leafSize = leafSize
+    self.order = np.arange( len( self.points ) ) #Posiciones originales, agrupadas por hoja.
+    #Nodos: rango [inicio, fin) de 'order', caja ( mínimos, máximos ) e hijos (-1 en las hojas).
+    self.ranges: list[tuple[int, int]] = []
+    self.boxes: list[tuple[np.ndarray, np.ndarray]] = []
+    self.children: list[tuple[int, int]] = []
+    if len( self.points ): self._build( 0, len( self.points ) )
+    self.sorted = self.points[self.order] #Puntos en el orden de las hojas, contiguos por hoja.
+
+  def __len__( self ): return len( self.points )
+
+  #Construye el subárbol de order[start:stop] dividiendo por la mediana de la dimensión más extendida.
+  def _build( self, start, stop ) -> int:
+    node = len( self.ranges )
+    points = self.points[ self.order[start:stop] ]
+    low, high = points.min( axis=0 ), points.max( axis=0 )
+    self.ranges.append( ( start, stop ) )
+    self.boxes.append( ( low, high ) )
+    self.children.append( ( -1, -1 ) )
+    if stop - start <= self.leafSize: return node
+
+    axis = int( np.argmax( high - low ) )
+    middle = ( stop - start ) // 2
+    self.order[start:stop] = self.order[start:stop][ np.argpartition( points[:, axis], middle ) ]
+    self.children[node] = ( self._build( start, start + middle ), self._build( start + middle, stop ) )
+    return node
+
+  #Cuadrado de la menor distancia de 'point' a la caja de un nodo.
+  def _boxDistance( self, node, point ) -> float:
+    low, high = self.boxes[node]
+    gap = np.maximum( np.maximum( low - point, point - high ), 0 )
+    return float( gap @ gap )
+
+  #Los 'k' puntos más cercanos a ( latitude, longitude ): lista de ( posición, kilómetros ) de menor a mayor.
+  def nearest( self, latitude, longitude, k = 1 ) -> list[tuple[int, float]]:
+    if not len( self ) or k < 1: return []
+    point = unitVectors( latitude, longitude )
+    best: list[tuple[float, int]] = [] #Montículo de ( -cuerda², posición ) con los k mejores.
+    toVisit = [ ( 0.0, 0 ) ] #( cota inferior, nodo ).
+
+    while toVisit:
+      bound, node = heapq.heappop( toVisit )
+      if len( best ) == k and bound >= -best[0][0]: break #Ningún nodo restante puede mejorar.
+      left, right = self.children[node]
+      if left < 0:
+        start, stop = self.ranges[node]
+        squared = ( ( self.sorted[start:stop] - point )**2 ).sum( axis=1 )
+        for i in np.argsort( squared )[:k].tolist():
+          entry = ( -float( squared[i] ), int( self.order[start + i] ) )
+          if len( best ) < k: heapq.heappush( best, entry )
+          elif entry > best[0]: heapq.heapreplace( best, entry )
+          else: break
+      else:
+        for child in ( left, right ): heapq.heappush( toVisit, ( self._boxDistance( child, point ), child ) )
+
+    best.sort( reverse=True )
+    return list( zip( [ i for _, i in best ], arcs( np.sqrt( [ -squared for squared, _ in best ] ) ).tolist() ) )
+
+  #Puntos a no más de 'km' kilómetros de ( latitude, longitude ): lista de ( posición, kilómetros ) de menor a mayor.
+  def withinRadius( self, latitude, longitude, km ) -> list[tuple[int, float]]:
+    if not len( self ) or km < 0: return []
+    point = unitVectors( latitude, longitude )
+    chord = 2 * np.sin( min( km / EARTH_RADIUS, np.pi ) / 2 ) #Cuerda equivalente al radio pedido.
+    limit = chord * chord
+    found, squares = [], []
+    toVisit = [ 0 ]
+
+    while toVisit:
+      node = toVisit.pop()
+      if self._boxDistance( node, point ) > limit: continue
+      left, right = self.children[node]
+      if left < 0:
+        start, stop = self.ranges[node]
+        squared = ( ( self.sorted[start:stop] - point )**2 ).sum( axis=1 )
+        inside = np.flatnonzero( squared <= limit )
+        found.append( self.order[start + inside] )
+        squares.append( squared[inside] )
+      else:
+        toVisit.extend( ( left, right ) )
+
+    if not found: return []
+    found, squares = np.concatenate( found ), np.concatenate( squares )
+    order = np.argsort( squares, kind='stable' )
+    return list( zip( found[order].tolist(), arcs( np.sqrt( squares[order] ) ).tolist() ) )
@@ -0,0 +1,25 @@
+from compact import CompactGraph
+from graph import Graph
+import math
+
+def network():
+  graph = Graph()
+  graph.newVertices( [
+    { 'Code': 'AAA', 'Name': 'Alfa', 'City': math.nan, 'Country': 'X', 'Latitude': 1.0, 'Longitude': 2.0 },
+    { 'Code': 'BBB', 'Name': 'Beta', 'City': 'Bravo', 'Country': 'Y', 'Latitude': 3.0, 'Longitude': 4.0 },
+  ] )
+  graph.newEdges( [ 'AAA' ], [ 'BBB' ], [ 5.0 ] )
+  return graph
+
+#Un texto faltante (NaN) sigue faltando después de guardar y cargar la instantánea.
+def test_snapshot_keeps_missing_values( tmp_path ):
+  network().save( tmp_path )
+
+  loaded = Graph.load( tmp_path )
+  city = loaded.getVertex( 'AAA' ).data['City']
+  assert isinstance( city, float ) and math.isnan( city )
+  assert loaded.getVertex( 'BBB' ).data['City'] == 'Bravo'
+
+  compact = CompactGraph.load( tmp_path )
+  assert math.isnan( compact.getVertex( 'AAA' ).data['City'] )
+  assert compact.getVertex( 'BBB' ).data == loaded.getVertex( 'BBB' ).data
@@ -0,0 +1,40 @@
+import threading
+from executor import QueryExecutor
+
+#Widget mínimo: 'after' solo guarda la llamada, que la prueba ejecuta a mano.
+class Widget:
+  def __init__( self ):
+    self.pending = []
+
+  def after( self, interval, callback ):
+    self.pending.append( callback )
+
+  def run( self ):
+    while self.pending: self.pending.pop( 0 )()
+
+#Si un 'done' falla, el error se muestra y las demás consultas se siguen entregando.
+def test_failing_callback_keeps_polling():
+  widget = Widget()
+  executor = QueryExecutor( widget )
+  errors, results = [], []
+  executor.showError = errors.append
+  release = threading.Event()
+
+  def fail( _ ): raise RuntimeError( 'done' )
+  try:
+    executor.submit( 'first', lambda query: 1, fail )
+    executor.submit( 'second', lambda query: release.wait() and 2, results.append )
+    executor.queries['first'][0].future.result()
+    widget.pending.pop( 0 )() #Entrega la primera mientras la segunda sigue en curso.
+    assert [ str( e ) for e in errors ] == [ 'done' ] and widget.pending
+    release.set()
+    widget.run()
+
+    assert results == [ 2 ]
+    assert not executor._polling
+    executor.submit( 'third', lambda query: 3, results.append )
+    widget.run()
+    assert results == [ 2, 3 ]
+  finally:
+    release.set()
+    executor.shutdown()
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from math import inf
+from graph import Graph, haversine
+
+def network():
+  graph = Graph()
+  graph.newVertices( [
+    { 'Code': 'AAA', 'Name': 'Alfa', 'Latitude': 0.0, 'Longitude': 0.0 },
+    { 'Code': 'BBB', 'Name': 'Beta', 'Latitude': 0.0, 'Longitude': 1.0 },
+  ] )
+  graph.newEdge( 'AAA', 'BBB', 10 )
+  graph.newEdge( 'AAA', 'AAA', 0 )
+  return graph
+
+#Quitar un lazo quita sus dos medias aristas de la misma lista.
+def test_remove_self_loop():
+  graph = network()
+  graph.summary()
+
+  removed = graph.removeEdge( 'AAA', 'AAA' )
+  assert removed is not None and removed.vertices[0] is removed.vertices[1]
+  assert [ e.vertices[1] for e in graph.getVertex( 'AAA' ).edges ] == [ graph.getVertex( 'BBB' ) ]
+  assert len( graph.edges ) == 1
+  assert graph.isConnected()
+
+#Un vértice con un lazo se puede quitar junto con todas sus rutas.
+def test_remove_vertex_with_self_loop():
+  graph = network()
+  graph.summary()
+
+  assert graph.removeVertex( 'AAA' )['Code'] == 'AAA'
+  assert graph.getVertex( 'AAA' ) is None
+  assert graph.edges == []
+  assert graph.getVertex( 'BBB' ).edges == []
+  assert len( graph.connectedComponents() ) == 1
+
+#Grafo aleatorio (con semilla) de aeropuertos y rutas cuyo peso es al menos la distancia de Haversine,
+#como en los datos reales; así la cota de A* sigue siendo válida.
+def randomNetwork( seed, size = 60, routes = 150 ):
+  rng = np.random.default_rng( seed )
+  graph = Graph()
+  graph.newVertices( [
+    { 'Code': f"A{ i :03d}", 'Name': f"Aeropuerto { i }", 'Latitude': float( lat ), 'Longitude': float( lon ) }
+    for i, ( lat, lon ) in enumerate( zip( rng.uniform( -60, 60, size ), rng.uniform( -180, 180, size ) ) )
+  ] )
+  for _ in range( routes ):
+    a, b = rng.choice( size, 2, replace=False )
+    source, destination = graph.getVertex( f"A{ a :03d}" ), graph.getVertex( f"A{ b :03d}" )
+    graph.newEdge( f"A{ a :03d}", f"A{ b :03d}", graph._arc( source, destination ) * rng.uniform( 1, 1.5 ) )
+  return graph, rng
+
+#La jerarquía de contracción y A* (simple y bidireccional) dan las mismas distancias que Dijkstra.
+@pytest.mark.parametrize( 'seed', [ 1, 2, 3 ] )
+def test_routes_match_dijkstra( seed ):
+  graph, rng = randomNetwork( seed )
+  graph.contract()
+  vertices = graph.vertices
+
+  for _ in range( 30 ):
+    source, destination = ( vertices[i] for i in rng.choice( len( vertices ), 2, replace=False ) )
+    expected = graph.dijkstra( source )[destination][0]
+    for path in ( graph._hierarchyRoute( source, destination ), graph.astar( source, destination ), graph.astar( source, destination, bidirectional=True ) ):
+      assert path.distance == pytest.approx( expected )
+      if expected < inf: assert path.vertices[0] is source and path.vertices[-1] is destination
+
+#'nearest' y 'withinRadius' coinciden con una búsqueda lineal sobre todos los vértices.
+@pytest.mark.parametrize( 'seed', [ 1, 2, 3 ] )
+def test_spatial_queries_match_linear_scan( seed ):
+  graph, rng = randomNetwork( seed )
+  vertices = graph.vertices
+  latitudes = np.radians( [ v.data['Latitude'] for v in vertices ] )
+  longitudes = np.radians( [ v.data['Longitude'] for v in vertices ] )
+
+  for lat, lon in zip( rng.uniform( -70, 70, 10 ), rng.uniform( -180, 180, 10 ) ):
+    distances = haversine( np.radians( lat ), np.radians( lon ), latitudes, longitudes )
+    order = np.argsort( distances, kind='stable' )
+
+    found = graph.nearest( lat, lon, 5 )
+    assert [ km for _, km in found ] == pytest.approx( distances[order[:5]].tolist() )
+    assert { v for v, _ in found } == { vertices[i] for i in order[:5] }
+
+    radius = float( np.median( distances ) )
+    found = graph.withinRadius( lat, lon, radius )
+    assert { v for v, _ in found } == { vertices[i] for i in np.flatnonzero( distances <= radius ) }
+    assert [ km for _, km in found ] == sorted( km for _, km in found )